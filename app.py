@@ -14,20 +14,18 @@
 # You should have received a copy of the GNU Affero General Public License
 # along with this program.  If not, see <https://www.gnu.org/licenses/>.
 
-from flask import Flask, jsonify, request, render_template, send_file, Response
+from flask import Flask, jsonify, request, render_template, send_file, Response, make_response
 import json
 import os
+import errno
+import stat
 import logging
 import tempfile
 import base64
 import re
-import urllib.parse
 from pathlib import Path
 import time
-import hashlib
-from collections import defaultdict, Counter
-from datetime import datetime, timedelta
-import difflib
+from datetime import datetime
 import threading
 from typing import Dict, List, Tuple, Optional, Any
 import urllib.request
@@ -37,14 +35,21 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import subprocess
 import shutil
+import itertools
+import functools
+from concurrent.futures import ThreadPoolExecutor
+import fcntl
 from werkzeug.middleware.proxy_fix import ProxyFix
+from werkzeug.wsgi import wrap_file
+from werkzeug.exceptions import RequestedRangeNotSatisfiable
 import signal
 import sys
+import atexit
 
 from config import (
     MUSIC_DIR, OWNER_UID, OWNER_GID, PORT, HOST,
-    AUDIO_EXTENSIONS, MIME_TYPES, FORMAT_METADATA_CONFIG,
-    SHOW_HIDDEN_FILES,
+    MIME_TYPES, STREAM_CACHE_MAX_AGE, FORMAT_METADATA_CONFIG,
+    SHOW_HIDDEN_FILES, LAZY_WARMUP, BATCH_MAX_WORKERS,
     MAX_HISTORY_ITEMS, INFERENCE_CACHE_DURATION, 
     MUSICBRAINZ_RATE_LIMIT, MUSICBRAINZ_USER_AGENT,
     FIELD_THRESHOLDS, logger
@@ -58,22 +63,31 @@ from core.history import (
     create_batch_delete_field_action
 )
 
-from core.inference import inference_engine
-from core.file_utils import validate_path, fix_file_ownership, get_file_format
-from core.metadata.normalizer import normalize_metadata_tags, get_metadata_field_mapping
+from core.file_utils import (
+    validate_path, fix_file_ownership, get_file_format, is_audio_file,
+    list_audio_files, list_audio_files_relative, move_folder_tree
+)
 from core.metadata.reader import read_metadata, get_format_limitations
 from core.metadata.writer import apply_metadata_to_file
 from core.metadata.mutagen_handler import mutagen_handler
 from core.album_art.extractor import extract_album_art
-from core.album_art.processor import detect_corrupted_album_art, fix_corrupted_album_art
 from core.album_art.manager import (
     save_album_art_to_file, process_album_art_change, 
     prepare_batch_album_art_change, record_batch_album_art_history
 )
-from core.batch.processor import process_folder_files
+from core.batch.processor import process_folder_files, error_report
+from core.transcode import get_cached_wav, stream_wav_decode
+
+# Load format handlers while the worker boots rather than on its first request
+if not LAZY_WARMUP:
+    mutagen_handler.warmup()
 
 app = Flask(__name__)
 
+# Serialize JSON responses in insertion order; sorting keys of every dict in
+# large tree/file listings is wasted work since clients never rely on key order
+app.json.sort_keys = False
+
 # Configure for reverse proxy
 # This ensures Flask correctly interprets headers set by the reverse proxy
 app.wsgi_app = ProxyFix(
@@ -85,62 +99,281 @@ app.wsgi_app = ProxyFix(
 )
 
 # Configure proper SIGTERM handling for graceful shutdown
+# Set once a shutdown signal arrives; new requests are refused while in-flight ones drain
+_shutdown = threading.Event()
+
 def signal_handler(sig, frame):
     logger.info('Received shutdown signal, cleaning up...')
-    sys.exit(0)
+    _shutdown.set()
+    # Defer to the server's own handler (e.g. gunicorn's worker exit) so it can
+    # finish the current request; only exit directly when there is none
+    previous = _previous_signal_handlers.get(sig)
+    if callable(previous):
+        previous(sig, frame)
+    else:
+        sys.exit(0)
+
+_previous_signal_handlers = {
+    signal.SIGTERM: signal.signal(signal.SIGTERM, signal_handler),
+    signal.SIGINT: signal.signal(signal.SIGINT, signal_handler),
+}
+
+# Remove history temp files however the process exits
+atexit.register(history.cleanup)
+
+# Security headers applied to every response
+CONTENT_SECURITY_POLICY = (
+    "default-src 'self'; "
+    "script-src 'self' 'unsafe-inline'; "  # unsafe-inline needed for onclick handlers
+    "style-src 'self' 'unsafe-inline'; "   # unsafe-inline needed for inline styles
+    "img-src 'self' data: blob:; "         # data: for base64 images, blob: for album art
+    "font-src 'self'; "
+    "connect-src 'self'; "
+    "media-src 'self'; "                    # For audio streaming
+    "object-src 'none'; "
+    "base-uri 'self'; "
+    "form-action 'self'; "
+    "frame-ancestors 'none';"
+)
+
+SECURITY_HEADERS = {
+    'X-Content-Type-Options': 'nosniff',
+    'X-Frame-Options': 'DENY',
+    'X-XSS-Protection': '1; mode=block',
+    'Referrer-Policy': 'strict-origin-when-cross-origin',
+    'Content-Security-Policy': CONTENT_SECURITY_POLICY
+}
+
+# Cache-control headers for JSON responses
+JSON_CACHE_HEADERS = {
+    'Cache-Control': 'no-store, no-cache, must-revalidate, private',
+    'Pragma': 'no-cache',
+    'Expires': '0'
+}
 
-signal.signal(signal.SIGTERM, signal_handler)
-signal.signal(signal.SIGINT, signal_handler)
+@app.before_request
+def reject_during_shutdown():
+    """Refuse new requests once a shutdown signal has been received"""
+    if _shutdown.is_set():
+        return jsonify({'error': 'Server is shutting down'}), 503
 
 @app.after_request
 def add_security_headers(response):
     """Add security headers and cache-control headers"""
-    # Security headers for all responses
-    response.headers['X-Content-Type-Options'] = 'nosniff'
-    response.headers['X-Frame-Options'] = 'DENY'
-    response.headers['X-XSS-Protection'] = '1; mode=block'
-    response.headers['Referrer-Policy'] = 'strict-origin-when-cross-origin'
-    
-    # Content Security Policy
-    csp = (
-        "default-src 'self'; "
-        "script-src 'self' 'unsafe-inline'; "  # unsafe-inline needed for onclick handlers
-        "style-src 'self' 'unsafe-inline'; "   # unsafe-inline needed for inline styles
-        "img-src 'self' data: blob:; "         # data: for base64 images, blob: for album art
-        "font-src 'self'; "
-        "connect-src 'self'; "
-        "media-src 'self'; "                    # For audio streaming
-        "object-src 'none'; "
-        "base-uri 'self'; "
-        "form-action 'self'; "
-        "frame-ancestors 'none';"
-    )
-    response.headers['Content-Security-Policy'] = csp
-    
-    # Cache-control headers for JSON responses
-    if response.mimetype == 'application/json':
-        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, private'
-        response.headers['Pragma'] = 'no-cache'
-        response.headers['Expires'] = '0'
-    
+    response.headers.update(SECURITY_HEADERS)
+    # Compare the raw Content-Type prefix rather than parsing it via response.mimetype;
+    # JSON carrying an ETag is revalidated rather than never stored, so it sets its own
+    if response.headers.get('Content-Type', '').startswith('application/json') and 'ETag' not in response.headers:
+        response.headers.update(JSON_CACHE_HEADERS)
     return response
 
 # =============
 # HELPER FUNCTIONS
 # =============
 
+# Requests are served on several threads, but anything that changes files or
+# history runs one at a time: mutagen rewrites the whole file on save, so
+# overlapping saves could lose an edit, and undo/redo check is_undone before
+# writing. Reads stay concurrent.
+WRITE_LOCK = threading.RLock()
+
+def serialize_writes(view):
+    """Run a request that changes files or history while holding WRITE_LOCK"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        with WRITE_LOCK:
+            return view(*args, **kwargs)
+    return wrapper
+
+LOG_TRUNCATION_SUFFIX = '...[truncated]'
+
+# Request validation patterns, compiled once
+INVALID_NAME_CHARS_RE = re.compile(r'[<>:"|?*]')
+CUSTOM_FIELD_NAME_RE = re.compile(r'[A-Za-z0-9_ ]+')
+
+# Reserved folder names (Windows compatibility)
+RESERVED_FOLDER_NAMES = frozenset(
+    ['CON', 'PRN', 'AUX', 'NUL'] +
+    [f'COM{i}' for i in range(1, 10)] +
+    [f'LPT{i}' for i in range(1, 10)]
+)
+
+# Standard fields are only ever matched by their own name, never a custom-field prefix
+STANDARD_FIELD_NAMES = frozenset(['title', 'artist', 'album', 'albumartist', 'date', 'genre', 'track', 'disc', 'composer'])
+
+# Prefixes formats put in front of custom field names (ID3 TXXX, ASF, MP4 freeform)
+FORMAT_FIELD_PREFIXES = ('TXXX:', 'WM/', '----:com.apple.iTunes:')
+
+# Read size for range responses that the server can't hand to sendfile()
+STREAM_CHUNK_SIZE = 1024 * 1024
+
+# WavPack transcoding: response chunk size and the stdout pipe size requested from the kernel
+WAV_TRANSCODE_CHUNK_SIZE = 256 * 1024
+WAV_TRANSCODE_PIPE_SIZE = 1024 * 1024
+
+class ByteRangeFile:
+    """Read-only view of one byte range of an open file, for wsgi.file_wrapper"""
+    
+    def __init__(self, f, start, length):
+        self.f = f
+        self.f.seek(start)
+        self.remaining = length
+    
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+    
+    def fileno(self):
+        # gunicorn sendfile()s from the current offset for Content-Length bytes
+        return self.f.fileno()
+    
+    def close(self):
+        self.f.close()
+
+def strip_field_prefix(key):
+    """Strip a format-specific custom-field prefix (TXXX:, WM/, ----:com.apple.iTunes:) from a key"""
+    for prefix in FORMAT_FIELD_PREFIXES:
+        if key.startswith(prefix):
+            return key[len(prefix):]
+    return key
+
+def field_key_matcher(field):
+    """Build a predicate accepting the tag keys find_existing_field could match for field"""
+    field_lower = field.lower()
+    strip_prefixes = field_lower not in STANDARD_FIELD_NAMES
+    
+    def matches(key):
+        name = strip_field_prefix(key) if strip_prefixes else key
+        return key == field or name.lower() == field_lower
+    
+    return matches
+
+def find_existing_field(field, existing_metadata, all_discovered):
+    """Look a field up case-insensitively in one file's metadata, returning (field_exists, old_value)"""
+    field_lower = field.lower()
+    
+    # Exact names first, then the first case-insensitive match; each scan stops
+    # as soon as it finds one
+    existing_key = field if field in existing_metadata else next(
+        (key for key in existing_metadata if key.lower() == field_lower), None)
+    
+    discovered_key = field if field in all_discovered else None
+    if discovered_key is None:
+        # Custom fields are also matched without their format-specific prefix
+        if field_lower in STANDARD_FIELD_NAMES:
+            names = ((key, key) for key in all_discovered)
+        else:
+            names = ((key, strip_field_prefix(key)) for key in all_discovered)
+        discovered_key = next((key for key, name in names if name.lower() == field_lower), None)
+    
+    field_exists = existing_key is not None or discovered_key is not None
+    old_value = ((existing_key is not None and existing_metadata[existing_key]) or
+                 (discovered_key is not None and all_discovered[discovered_key].get('value')) or '')
+    return field_exists, old_value
+
+def map_concurrently(func, items):
+    """Run func over items on worker threads, returning results in input order"""
+    if len(items) < 2:
+        return list(map(func, items))
+    # Per-file tag work is independent and mostly waits on disk I/O
+    with ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(items))) as executor:
+        return list(executor.map(func, items))
+
+def apply_to_files(operation, filepaths):
+    """Run operation on each file concurrently, returning (files_updated, errors)"""
+    # operation returns True when it updated the file, False to skip it quietly,
+    # and raises on failure
+    def run(filepath):
+        try:
+            return operation(filepath)
+        except Exception as e:
+            return f"{os.path.basename(filepath)}: {str(e)}"
+    
+    files_updated = 0
+    errors = []
+    for outcome in map_concurrently(run, filepaths):
+        if outcome is True:
+            files_updated += 1
+        elif outcome:
+            errors.append(outcome)
+    return files_updated, errors
+
+def json_stream_response(key, items):
+    """Respond with {key: [...]} serialized one item at a time as the body is written"""
+    def generate():
+        yield f'{{"{key}":['
+        separator = ''
+        for item in items:
+            yield separator + app.json.dumps(item)
+            separator = ','
+        yield ']}'
+    
+    return Response(generate(), mimetype='application/json')
+
+def stream_etag(st):
+    """Build an ETag for a streamed file from its stat result"""
+    # Any tag edit rewrites the file, so mtime and size identify the content
+    # without hashing the audio data
+    return f"{st.st_mtime_ns:x}-{st.st_size:x}"
+
+def serve_file_with_range(file_path, st, mimetype, download_name=None):
+    """Serve a file inline with conditional and Range request support"""
+    # send_file handles Range, If-Range and the stat-derived ETag (so repeat
+    # plays get a 304), and hands the open file to wsgi.file_wrapper, which
+    # gunicorn serves with sendfile() (see gunicorn_config.py)
+    try:
+        response = send_file(
+            file_path, mimetype=mimetype, as_attachment=False,
+            download_name=download_name or os.path.basename(file_path),
+            conditional=True, etag=stream_etag(st), last_modified=st.st_mtime
+        )
+    except RequestedRangeNotSatisfiable as e:
+        return e.get_response()
+    
+    # Werkzeug only sets Accept-Ranges on partial responses; advertise it on
+    # full ones too so players can seek without a full download first
+    response.headers['Accept-Ranges'] = 'bytes'
+    
+    # The library is per-user content, so keep it out of shared caches; within
+    # max-age the browser replays the file without even a 304 round trip
+    response.cache_control.private = True
+    if STREAM_CACHE_MAX_AGE > 0:
+        response.cache_control.no_cache = None
+        response.cache_control.max_age = STREAM_CACHE_MAX_AGE
+    
+    if response.status_code == 206:
+        # Werkzeug slices partial content in Python, which hides the file from
+        # the server; swap in a file wrapper over just the range so seeks are
+        # sendfile()d too
+        byte_start = response.content_range.start
+        length = response.content_range.stop - byte_start
+        response.response.close()
+        
+        f = open(file_path, 'rb')
+        # Ask the kernel for aggressive readahead over the requested span
+        if hasattr(os, 'posix_fadvise'):
+            os.posix_fadvise(f.fileno(), byte_start, length, os.POSIX_FADV_SEQUENTIAL)
+        response.response = wrap_file(request.environ, ByteRangeFile(f, byte_start, length), STREAM_CHUNK_SIZE)
+    
+    return response
+
 def sanitize_log_data(data):
     """Sanitize data for logging by truncating base64 image data"""
     if not isinstance(data, dict):
         return data
     
-    sanitized = {}
-    for key, value in data.items():
-        if key == 'art' and isinstance(value, str) and value.startswith('data:image'):
-            # Truncate base64 image data
-            sanitized[key] = value[:50] + '...[truncated]'
-        else:
-            sanitized[key] = value
+    # Only album art needs truncating, so avoid copying the dict when it is absent
+    art = data.get('art')
+    if not (isinstance(art, str) and art[:10] == 'data:image'):
+        return data
+    
+    sanitized = data.copy()
+    sanitized['art'] = art[:50] + LOG_TRUNCATION_SUFFIX
     return sanitized
 
 # =============
@@ -167,61 +400,16 @@ def stream_audio(filepath):
     try:
         file_path = validate_path(os.path.join(MUSIC_DIR, filepath))
         
-        if not os.path.exists(file_path):
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
             return jsonify({'error': 'File not found'}), 404
         
-        file_size = os.path.getsize(file_path)
-        range_header = request.headers.get('range', None)
-        
-        # Prepare filename for Content-Disposition header
-        basename = os.path.basename(file_path)
-        safe_filename = basename.encode('ascii', 'ignore').decode('ascii')
-        utf8_filename = urllib.parse.quote(basename, safe='')
-        
         # Get MIME type
         ext = os.path.splitext(file_path.lower())[1]
         mimetype = MIME_TYPES.get(ext, 'audio/mpeg')
         
-        if range_header:
-            # Parse range header
-            byte_start = 0
-            byte_end = file_size - 1
-            
-            match = re.search(r'bytes=(\d+)-(\d*)', range_header)
-            if match:
-                byte_start = int(match.group(1))
-                if match.group(2):
-                    byte_end = int(match.group(2))
-            
-            # Generate partial content
-            def generate():
-                with open(file_path, 'rb') as f:
-                    f.seek(byte_start)
-                    remaining = byte_end - byte_start + 1
-                    chunk_size = 8192
-                    
-                    while remaining > 0:
-                        to_read = min(chunk_size, remaining)
-                        chunk = f.read(to_read)
-                        if not chunk:
-                            break
-                        remaining -= len(chunk)
-                        yield chunk
-            
-            return Response(
-                generate(),
-                status=206,
-                mimetype=mimetype,
-                headers={
-                    'Content-Range': f'bytes {byte_start}-{byte_end}/{file_size}',
-                    'Accept-Ranges': 'bytes',
-                    'Content-Length': str(byte_end - byte_start + 1),
-                    'Content-Disposition': f'inline; filename="{safe_filename}"; filename*=UTF-8\'\'{utf8_filename}'
-                }
-            )
-        else:
-            # Return full file
-            return send_file(file_path, mimetype=mimetype, as_attachment=False)
+        return serve_file_with_range(file_path, st, mimetype)
             
     except ValueError:
         return jsonify({'error': 'Invalid path'}), 403
@@ -235,23 +423,55 @@ def stream_wav_transcoded(filepath):
     try:
         file_path = validate_path(os.path.join(MUSIC_DIR, filepath))
         
-        if not os.path.exists(file_path):
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
             return jsonify({'error': 'File not found'}), 404
             
         # Only transcode .wv files
         if not file_path.lower().endswith('.wv'):
             return jsonify({'error': 'Not a WavPack file'}), 400
-            
+        
+        # Serve a cached decode when possible, so replays skip wvunpack entirely
+        cache_path = get_cached_wav(file_path, st)
+        if cache_path:
+            # The cached WAV is a regular file, so clients can seek in it with Range requests
+            download_name = os.path.splitext(os.path.basename(file_path))[0] + '.wav'
+            return serve_file_with_range(cache_path, os.stat(cache_path), 'audio/wav', download_name)
+        
+        # Otherwise stream the decode into the cache as it is written; requests
+        # arriving meanwhile (browsers send several per source) share it
+        try:
+            return Response(
+                stream_wav_decode(file_path, st, WAV_TRANSCODE_CHUNK_SIZE),
+                mimetype='audio/wav',
+                headers={
+                    'Accept-Ranges': 'none',
+                    'Cache-Control': 'no-cache'
+                }
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            logger.warning(f"WAV cache unavailable for {filepath}, streaming instead: {e}")
+        
         # Use wvunpack to convert to WAV and stream
         process = subprocess.Popen(
             ['wvunpack', '-q', file_path, '-o', '-'],
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
+            stderr=subprocess.DEVNULL,  # Never read, so a PIPE could fill up and stall wvunpack
+            bufsize=WAV_TRANSCODE_CHUNK_SIZE
         )
         
-        # Stream the WAV output
-        return Response(
-            process.stdout,
+        # Let wvunpack run ahead of the client into a larger pipe buffer (Linux only)
+        if hasattr(fcntl, 'F_SETPIPE_SZ'):
+            try:
+                fcntl.fcntl(process.stdout.fileno(), fcntl.F_SETPIPE_SZ, WAV_TRANSCODE_PIPE_SIZE)
+            except OSError:
+                pass
+        
+        # Stream the WAV output in fixed-size chunks; iterating the pipe itself
+        # would split the binary data on newline bytes
+        response = Response(
+            iter(lambda: process.stdout.read(WAV_TRANSCODE_CHUNK_SIZE), b''),
             mimetype='audio/wav',
             headers={
                 'Accept-Ranges': 'none',
@@ -259,48 +479,76 @@ def stream_wav_transcoded(filepath):
             }
         )
         
+        @response.call_on_close
+        def stop_transcoder():
+            # Reap wvunpack, stopping it first if the client went away mid-stream
+            process.stdout.close()
+            if process.poll() is None:
+                process.kill()
+            process.wait()
+        
+        return response
+        
     except Exception as e:
         logger.error(f"Error transcoding WavPack file {filepath}: {e}")
         return jsonify({'error': str(e)}), 500
 
+def describe_tree_folder(entry, rel_path):
+    """Build the tree item for one subfolder"""
+    item_rel_path = os.path.join(rel_path, entry.name) if rel_path else entry.name
+    
+    # One pass over the folder's immediate entries gives both whether it
+    # contains audio files and their total size (not recursive)
+    has_audio = False
+    folder_size = 0
+    try:
+        with os.scandir(entry.path) as sub_entries:
+            for sub_entry in sub_entries:
+                if is_audio_file(sub_entry.name) and sub_entry.is_file():
+                    has_audio = True
+                    folder_size += sub_entry.stat().st_size
+    except OSError:
+        pass
+    
+    try:
+        created = entry.stat().st_ctime
+    except OSError:
+        created = 0
+    
+    return {
+        'name': entry.name,
+        'path': item_rel_path,
+        'type': 'folder',
+        'hasAudio': has_audio,
+        'created': created,
+        'size': folder_size  # Add folder size
+    }
+
 def build_tree_items(path, rel_path=''):
-    """Build tree items for a directory"""
-    items = []
+    """Build tree items for a directory; folders are listed now but described as they are consumed"""
     try:
-        for item in sorted(os.listdir(path)):
-            item_path = os.path.join(path, item)
-            item_rel_path = os.path.join(rel_path, item) if rel_path else item
-            
-            if os.path.isdir(item_path):
-                # Check if folder contains audio files
-                has_audio = any(
-                    f.lower().endswith(AUDIO_EXTENSIONS)
-                    for f in os.listdir(item_path)
-                    if os.path.isfile(os.path.join(item_path, f))
-                )
-                
-                # Calculate folder size (optional - can be expensive for large folders)
-                folder_size = 0
-                try:
-                    # Quick size calculation - only immediate audio files, not recursive
-                    for f in os.listdir(item_path):
-                        if os.path.isfile(os.path.join(item_path, f)) and f.lower().endswith(AUDIO_EXTENSIONS):
-                            folder_size += os.path.getsize(os.path.join(item_path, f))
-                except OSError:
-                    folder_size = 0
-                
-                items.append({
-                    'name': item,
-                    'path': item_rel_path,
-                    'type': 'folder',
-                    'hasAudio': has_audio,
-                    'created': os.path.getctime(item_path),
-                    'size': folder_size  # Add folder size
-                })
+        with os.scandir(path) as it:
+            entries = sorted((entry for entry in it if entry.is_dir()), key=lambda entry: entry.name)
     except PermissionError:
-        pass
+        entries = []
     
-    return items
+    return describe_tree_folders(entries, rel_path)
+
+def describe_tree_folders(entries, rel_path):
+    """Yield tree items in order, scanning sibling folders concurrently"""
+    if len(entries) < 2:
+        for entry in entries:
+            yield describe_tree_folder(entry, rel_path)
+        return
+    
+    # Each folder scan is independent and mostly waits on stat syscalls,
+    # which adds up quickly on network-mounted libraries
+    executor = ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(entries)))
+    try:
+        yield from executor.map(describe_tree_folder, entries, itertools.repeat(rel_path))
+    finally:
+        # Drop queued scans if the client stops reading early
+        executor.shutdown(cancel_futures=True)
 
 @app.route('/tree/')
 @app.route('/tree/<path:subpath>')
@@ -313,7 +561,7 @@ def get_tree(subpath=''):
             return jsonify({'error': 'Path not found'}), 404
         
         items = build_tree_items(current_path, subpath)
-        return jsonify({'items': items})
+        return json_stream_response('items', items)
         
     except ValueError:
         return jsonify({'error': 'Invalid path'}), 403
@@ -330,37 +578,41 @@ def get_files(folder_path):
         if not os.path.exists(current_path):
             return jsonify({'error': 'Path not found'}), 404
         
-        files = []
+        # Paths are reported relative to MUSIC_DIR; work out the folder part once
+        rel_folder = os.path.relpath(current_path, MUSIC_DIR)
+        if rel_folder == '.':
+            rel_folder = ''
         
         # List files in the directory (not subdirectories)
-        for filename in sorted(os.listdir(current_path)):
-            # Skip hidden files unless configured to show them
-            if not SHOW_HIDDEN_FILES and filename.startswith('.'):
-                continue
-                
-            file_path = os.path.join(current_path, filename)
-            if os.path.isfile(file_path) and filename.lower().endswith(AUDIO_EXTENSIONS):
-                rel_path = os.path.relpath(file_path, MUSIC_DIR)
-                
-                # Get file stats for date and size
-                try:
-                    file_stats = os.stat(file_path)
-                    file_date = int(file_stats.st_mtime)  # Modification time as Unix timestamp
-                    file_size = file_stats.st_size         # Size in bytes
-                except OSError:
-                    # If we can't get stats, use defaults
-                    file_date = 0
-                    file_size = 0
-                
-                files.append({
-                    'name': filename,
-                    'path': rel_path,
-                    'folder': '.',  # All files are in the current folder
-                    'date': file_date,
-                    'size': file_size
-                })
+        with os.scandir(current_path) as it:
+            entries = [
+                entry for entry in it
+                # Skip hidden files unless configured to show them
+                if (SHOW_HIDDEN_FILES or not entry.name.startswith('.'))
+                and is_audio_file(entry.name) and entry.is_file()
+            ]
+        entries.sort(key=lambda entry: entry.name)
+        
+        def describe_file(entry):
+            # Get file stats for date and size
+            try:
+                file_stats = entry.stat()
+                file_date = int(file_stats.st_mtime)  # Modification time as Unix timestamp
+                file_size = file_stats.st_size         # Size in bytes
+            except OSError:
+                # If we can't get stats, use defaults
+                file_date = 0
+                file_size = 0
+            
+            return {
+                'name': entry.name,
+                'path': os.path.join(rel_folder, entry.name),
+                'folder': '.',  # All files are in the current folder
+                'date': file_date,
+                'size': file_size
+            }
         
-        return jsonify({'files': files})
+        return json_stream_response('files', map(describe_file, entries))
         
     except ValueError:
         return jsonify({'error': 'Invalid path'}), 403
@@ -369,6 +621,7 @@ def get_files(folder_path):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/rename', methods=['POST'])
+@serialize_writes
 def rename_file():
     """Rename a file"""
     try:
@@ -376,7 +629,10 @@ def rename_file():
         old_path = validate_path(os.path.join(MUSIC_DIR, data['oldPath']))
         new_name = data['newName']
         
-        if not os.path.exists(old_path):
+        # A missing source is reported before anything about the target
+        try:
+            os.stat(old_path)
+        except FileNotFoundError:
             return jsonify({'error': 'File not found'}), 404
         
         # Validate new name
@@ -391,12 +647,19 @@ def rename_file():
         # Build new path
         new_path = os.path.join(os.path.dirname(old_path), new_name)
         
-        # Check if target exists
-        if os.path.exists(new_path) and new_path != old_path:
+        # Check if target exists; os.rename would silently replace it
+        if new_path != old_path and os.path.exists(new_path):
             return jsonify({'error': 'File already exists'}), 400
         
-        # Rename file
-        os.rename(old_path, new_path)
+        # Rename file; the source can still vanish between the checks and the rename
+        try:
+            os.rename(old_path, new_path)
+        except FileNotFoundError:
+            return jsonify({'error': 'File not found'}), 404
+        except (IsADirectoryError, NotADirectoryError):
+            return jsonify({'error': 'Invalid filename'}), 400
+        except PermissionError:
+            return jsonify({'error': 'Permission denied'}), 403
         fix_file_ownership(new_path)
         
         # Update all history references to use the new filename
@@ -413,6 +676,7 @@ def rename_file():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/rename-folder', methods=['POST'])
+@serialize_writes
 def rename_folder():
     """Rename a folder and update all associated paths"""
     try:
@@ -420,19 +684,19 @@ def rename_folder():
         old_path = validate_path(os.path.join(MUSIC_DIR, data['oldPath']))
         new_name = data['newName']
         
-        if not os.path.exists(old_path):
+        # One stat answers both the existence and the folder check
+        try:
+            if not stat.S_ISDIR(os.stat(old_path).st_mode):
+                return jsonify({'error': 'Path is not a folder'}), 400
+        except FileNotFoundError:
             return jsonify({'error': 'Folder not found'}), 404
         
-        if not os.path.isdir(old_path):
-            return jsonify({'error': 'Path is not a folder'}), 400
-        
         # Validate new name
         if not new_name or '/' in new_name or '\\' in new_name:
             return jsonify({'error': 'Invalid folder name'}), 400
         
         # Additional validation for special characters
-        invalid_chars = '<>:"|?*'
-        if any(char in new_name for char in invalid_chars):
+        if INVALID_NAME_CHARS_RE.search(new_name):
             return jsonify({'error': 'Folder name contains invalid characters'}), 400
         
         # Check length
@@ -440,37 +704,26 @@ def rename_folder():
             return jsonify({'error': 'Folder name too long'}), 400
         
         # Check reserved names (Windows compatibility)
-        reserved_names = ['CON', 'PRN', 'AUX', 'NUL'] + \
-                        [f'COM{i}' for i in range(1, 10)] + \
-                        [f'LPT{i}' for i in range(1, 10)]
-        if new_name.upper() in reserved_names:
+        if new_name.upper() in RESERVED_FOLDER_NAMES:
             return jsonify({'error': 'Reserved folder name'}), 400
         
         # Build new path
         parent_dir = os.path.dirname(old_path)
         new_path = os.path.join(parent_dir, new_name)
         
-        # Check if target exists
-        if os.path.exists(new_path) and new_path != old_path:
+        # Check if target exists; os.rename would silently replace an empty folder
+        if new_path != old_path and os.path.exists(new_path):
             return jsonify({'error': 'Folder already exists'}), 400
         
-        # Get all files in the folder recursively before rename
-        old_files = []
-        for root, dirs, files in os.walk(old_path):
-            for file in files:
-                if file.lower().endswith(AUDIO_EXTENSIONS):
-                    old_files.append(os.path.join(root, file))
-        
         # Rename folder
-        os.rename(old_path, new_path)
+        try:
+            os.rename(old_path, new_path)
+        except FileNotFoundError:
+            return jsonify({'error': 'Folder not found'}), 404
         fix_file_ownership(new_path)
         
         # Update history references for all files in the renamed folder
-        for old_file_path in old_files:
-            # Calculate new file path
-            rel_path = os.path.relpath(old_file_path, old_path)
-            new_file_path = os.path.join(new_path, rel_path)
-            history.update_file_references(old_file_path, new_file_path)
+        history.rename_prefix(old_path + os.sep, new_path + os.sep)
         
         # Return new relative path with consistent response format
         new_rel_path = os.path.relpath(new_path, MUSIC_DIR)
@@ -479,7 +732,9 @@ def rename_folder():
     except ValueError:
         return jsonify({'error': 'Invalid path'}), 403
     except OSError as e:
-        if e.errno == 13:  # Permission denied
+        if e.errno in (errno.EEXIST, errno.ENOTEMPTY):
+            return jsonify({'error': 'Folder already exists'}), 400
+        elif e.errno == 13:  # Permission denied
             return jsonify({'error': 'Permission denied'}), 403
         elif e.errno == 28:  # No space left
             return jsonify({'error': 'Insufficient space'}), 507
@@ -490,6 +745,7 @@ def rename_folder():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/move-folder', methods=['POST'])
+@serialize_writes
 def move_folder():
     """Move a folder to a different location within the music directory"""
     try:
@@ -506,20 +762,20 @@ def move_folder():
         source_path = validate_path(os.path.join(MUSIC_DIR, source_rel_path))
         dest_parent_path = validate_path(os.path.join(MUSIC_DIR, dest_rel_path))
         
-        # Check that source folder exists
-        if not os.path.exists(source_path):
+        # Check that source folder exists; one stat covers existence and type
+        try:
+            if not stat.S_ISDIR(os.stat(source_path).st_mode):
+                return jsonify({'error': 'Source path is not a folder'}), 400
+        except FileNotFoundError:
             return jsonify({'error': 'Source folder not found'}), 404
         
-        if not os.path.isdir(source_path):
-            return jsonify({'error': 'Source path is not a folder'}), 400
-        
         # Check that destination parent exists
-        if not os.path.exists(dest_parent_path):
+        try:
+            if not stat.S_ISDIR(os.stat(dest_parent_path).st_mode):
+                return jsonify({'error': 'Destination path is not a folder'}), 400
+        except FileNotFoundError:
             return jsonify({'error': 'Destination folder not found'}), 404
         
-        if not os.path.isdir(dest_parent_path):
-            return jsonify({'error': 'Destination path is not a folder'}), 400
-        
         # Get the folder name to move
         folder_name = os.path.basename(source_path)
         dest_path = os.path.join(dest_parent_path, folder_name)
@@ -542,26 +798,24 @@ def move_folder():
             logger.error(f"Error validating paths: {e}")
             return jsonify({'error': 'Invalid path configuration'}), 400
         
-        # Check if destination already contains a folder with the same name
+        # Check if destination already contains a folder with the same name;
+        # os.rename would silently replace an empty one
         if os.path.exists(dest_path):
             return jsonify({'error': 'A folder with this name already exists in the destination'}), 400
         
-        # Get all audio files in the folder recursively before moving
-        old_files = []
-        for root, dirs, files in os.walk(source_path):
-            for file in files:
-                if file.lower().endswith(AUDIO_EXTENSIONS):
-                    old_files.append(os.path.join(root, file))
-        
         logger.info(f"Moving folder from {source_path} to {dest_path}")
         
         # Move the folder
         try:
-            shutil.move(source_path, dest_path)
+            move_folder_tree(source_path, dest_path)
+        except FileNotFoundError:
+            return jsonify({'error': 'Source folder not found'}), 404
         except PermissionError:
             return jsonify({'error': 'Permission denied'}), 403
         except OSError as e:
-            if e.errno == 28:  # No space left
+            if e.errno in (errno.EEXIST, errno.ENOTEMPTY):
+                return jsonify({'error': 'A folder with this name already exists in the destination'}), 400
+            elif e.errno == 28:  # No space left
                 return jsonify({'error': 'Insufficient space'}), 507
             else:
                 logger.error(f"OS error moving folder: {e}")
@@ -571,11 +825,7 @@ def move_folder():
         fix_file_ownership(dest_path)
         
         # Update history references for all files in the moved folder
-        for old_file_path in old_files:
-            # Calculate new file path
-            rel_path = os.path.relpath(old_file_path, source_path)
-            new_file_path = os.path.join(dest_path, rel_path)
-            history.update_file_references(old_file_path, new_file_path)
+        history.rename_prefix(source_path + os.sep, dest_path + os.sep)
         
         # Return new relative path
         new_rel_path = os.path.relpath(dest_path, MUSIC_DIR)
@@ -591,6 +841,7 @@ def move_folder():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/create-folder', methods=['POST'])
+@serialize_writes
 def create_folder():
     """Create a new folder within the music directory"""
     try:
@@ -607,8 +858,7 @@ def create_folder():
             return jsonify({'error': 'Folder name cannot contain path separators'}), 400
         
         # Additional validation for special characters
-        invalid_chars = '<>:"|?*'
-        if any(char in folder_name for char in invalid_chars):
+        if INVALID_NAME_CHARS_RE.search(folder_name):
             return jsonify({'error': 'Folder name contains invalid characters'}), 400
         
         # Check length
@@ -616,10 +866,7 @@ def create_folder():
             return jsonify({'error': 'Folder name too long'}), 400
         
         # Check reserved names (Windows compatibility)
-        reserved_names = ['CON', 'PRN', 'AUX', 'NUL'] + \
-                        [f'COM{i}' for i in range(1, 10)] + \
-                        [f'LPT{i}' for i in range(1, 10)]
-        if folder_name.upper() in reserved_names:
+        if folder_name.upper() in RESERVED_FOLDER_NAMES:
             return jsonify({'error': 'Reserved folder name'}), 400
         
         # Prevent hidden folders (starting with .)
@@ -633,20 +880,14 @@ def create_folder():
         # Validate the new folder path is within MUSIC_DIR
         new_folder_path = validate_path(new_folder_path)
         
-        # Check if parent exists
-        if not os.path.exists(parent_abs_path):
+        # Create the folder; mkdir itself reports a missing or non-folder parent
+        # and an existing target
+        try:
+            os.mkdir(new_folder_path)
+        except FileNotFoundError:
             return jsonify({'error': 'Parent folder not found'}), 404
-        
-        if not os.path.isdir(parent_abs_path):
+        except NotADirectoryError:
             return jsonify({'error': 'Parent path is not a folder'}), 400
-        
-        # Check if folder already exists
-        if os.path.exists(new_folder_path):
-            return jsonify({'error': 'Folder already exists'}), 400
-        
-        # Create the folder
-        try:
-            os.makedirs(new_folder_path, exist_ok=False)
         except FileExistsError:
             return jsonify({'error': 'Folder already exists'}), 400
         except PermissionError:
@@ -678,6 +919,7 @@ def create_folder():
         return jsonify({'error': 'Internal server error'}), 500
 
 @app.route('/delete-folder', methods=['POST'])
+@serialize_writes
 def delete_folder():
     """Delete a folder from the music directory"""
     try:
@@ -691,21 +933,20 @@ def delete_folder():
         
         abs_folder_path = validate_path(os.path.join(MUSIC_DIR, folder_path))
         
-        # Check if folder exists
-        if not os.path.exists(abs_folder_path):
-            return jsonify({'error': 'Folder not found'}), 404
-        
-        if not os.path.isdir(abs_folder_path):
-            return jsonify({'error': 'Path is not a folder'}), 400
-        
         # Prevent deletion of the root music directory
         if os.path.abspath(abs_folder_path) == os.path.abspath(MUSIC_DIR):
             return jsonify({'error': 'Cannot delete the root music directory'}), 403
         
-        # Check if folder is empty
+        # Read the folder's entries once; they answer the existence and empty
+        # checks, the counts below and the top level of the audio file count
         try:
-            folder_contents = os.listdir(abs_folder_path)
-            is_empty = len(folder_contents) == 0
+            with os.scandir(abs_folder_path) as it:
+                folder_entries = list(it)
+            is_empty = len(folder_entries) == 0
+        except FileNotFoundError:
+            return jsonify({'error': 'Folder not found'}), 404
+        except NotADirectoryError:
+            return jsonify({'error': 'Path is not a folder'}), 400
         except PermissionError:
             return jsonify({'error': 'Permission denied'}), 403
         
@@ -714,11 +955,10 @@ def delete_folder():
             # Count files and subdirectories
             file_count = 0
             dir_count = 0
-            for item in folder_contents:
-                item_path = os.path.join(abs_folder_path, item)
-                if os.path.isfile(item_path):
+            for entry in folder_entries:
+                if entry.is_file():
                     file_count += 1
-                elif os.path.isdir(item_path):
+                elif entry.is_dir():
                     dir_count += 1
             
             return jsonify({
@@ -729,13 +969,14 @@ def delete_folder():
                 'requiresForce': True
             }), 400
         
-        # Collect all audio files before deletion for history cleanup
-        deleted_files = []
-        if not is_empty:
-            for root, dirs, files in os.walk(abs_folder_path):
-                for file in files:
-                    if file.lower().endswith(AUDIO_EXTENSIONS):
-                        deleted_files.append(os.path.join(root, file))
+        # Count audio files before deletion; only subfolders still need walking
+        files_deleted = 0
+        for entry in folder_entries:
+            if entry.is_dir():
+                if not entry.is_symlink():
+                    files_deleted += len(list_audio_files_relative(entry.path))
+            elif is_audio_file(entry.name):
+                files_deleted += 1
         
         # Delete the folder
         try:
@@ -745,6 +986,8 @@ def delete_folder():
                 shutil.rmtree(abs_folder_path)
             
             logger.info(f"Folder deleted successfully: {folder_path}")
+        except FileNotFoundError:
+            return jsonify({'error': 'Folder not found'}), 404
         except PermissionError:
             return jsonify({'error': 'Permission denied'}), 403
         except OSError as e:
@@ -756,7 +999,7 @@ def delete_folder():
         
         return jsonify({
             'status': 'success',
-            'filesDeleted': len(deleted_files)
+            'filesDeleted': files_deleted
         })
         
     except ValueError as e:
@@ -775,11 +1018,8 @@ def get_metadata(filename):
         # Get standard fields (for compatibility)
         standard_fields = read_metadata(filepath)
         
-        # Get only existing standard fields
-        existing_standard_fields = mutagen_handler.read_existing_metadata(filepath)
-        
-        # Discover all fields
-        all_fields = mutagen_handler.discover_all_metadata(filepath)
+        # Get only existing standard fields and discover all fields in one parse
+        existing_standard_fields, all_fields = mutagen_handler.read_and_discover(filepath)
         
         # Get album art
         art = extract_album_art(filepath)
@@ -817,6 +1057,7 @@ def get_metadata(filename):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/metadata/<path:filename>', methods=['POST'])
+@serialize_writes
 def set_metadata(filename):
     """Set metadata for a file"""
     try:
@@ -836,8 +1077,20 @@ def set_metadata(filename):
         # Process album art changes
         has_art_change, art_data, remove_art = process_album_art_change(filepath, data, current_metadata)
         
+        # Only fields whose stored value differs need writing; the editor's save
+        # button sends every field, most of them unchanged. The read only covers
+        # standard fields, so anything it didn't return (custom fields) is always written
+        changed_tags = {
+            field: new_value for field, new_value in metadata_tags.items()
+            if field not in current_metadata or current_metadata[field] != new_value
+        }
+        
+        # Nothing to change, so skip reopening and rewriting the file
+        if not changed_tags and not has_art_change:
+            return jsonify({'status': 'success'})
+        
         # Track individual metadata field changes
-        for field, new_value in metadata_tags.items():
+        for field, new_value in changed_tags.items():
             old_value = current_metadata.get(field, '')
             # Normalize for comparison (space = empty)
             normalized_old = '' if old_value == ' ' else old_value
@@ -852,10 +1105,10 @@ def set_metadata(filename):
         # Apply all changes
         if has_art_change:
             # This will apply both metadata and album art, and track art history
-            save_album_art_to_file(filepath, art_data, remove_art, metadata_tags, track_history=True)
+            save_album_art_to_file(filepath, art_data, remove_art, changed_tags, track_history=True)
         else:
             # Just apply metadata changes without album art
-            apply_metadata_to_file(filepath, metadata_tags)
+            apply_metadata_to_file(filepath, changed_tags)
         
         return jsonify({'status': 'success'})
         
@@ -867,6 +1120,7 @@ def set_metadata(filename):
 
 
 @app.route('/metadata/<path:filename>/<field_id>', methods=['DELETE'])
+@serialize_writes
 def delete_metadata_field(filename, field_id):
     """Delete a metadata field from a file"""
     try:
@@ -926,6 +1180,7 @@ def delete_metadata_field(filename, field_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/metadata/create-field', methods=['POST'])
+@serialize_writes
 def create_custom_field():
     """Create custom metadata fields with proper history tracking"""
     data = request.json
@@ -945,12 +1200,8 @@ def create_custom_field():
     if len(field_name) > 50:
         return jsonify({'status': 'error', 'message': 'Field name must be 50 characters or less'}), 400
     
-    # Check for null bytes
-    if '\x00' in field_name:
-        return jsonify({'status': 'error', 'message': 'Field name contains invalid characters'}), 400
-    
-    # Sanitize field name (alphanumeric, underscore, and spaces)
-    if not re.match(r'^[A-Za-z0-9_ ]+$', field_name):
+    # Sanitize field name (alphanumeric, underscore, and spaces); this also rejects null bytes
+    if not CUSTOM_FIELD_NAME_RE.fullmatch(field_name):
         return jsonify({'status': 'error', 'message': 'Invalid field name. Only alphanumeric characters, underscores, and spaces are allowed.'}), 400
     
     try:
@@ -970,65 +1221,70 @@ def create_custom_field():
             create_values = {}
             
             # Get all audio files in folder
-            audio_files = []
-            for filename in os.listdir(folder_path):
-                file_path = os.path.join(folder_path, filename)
-                if os.path.isfile(file_path) and filename.lower().endswith(AUDIO_EXTENSIONS):
-                    audio_files.append(file_path)
+            audio_files = list_audio_files(folder_path)
             
-            # Check each file and categorize
-            for file_path in audio_files:
+            # Only tags that could be this field need discovering in each file
+            field_matcher = field_key_matcher(field_name)
+            
+            def create_in_file(file_path):
+                """Check and write the field in one file, returning (field_exists, old_value, value_written, error)"""
+                field_exists = None
+                old_value = ''
+                value_to_write = field_value
                 try:
                     # Check if field exists (case-insensitive for some formats)
-                    existing_metadata = mutagen_handler.read_existing_metadata(file_path)
-                    all_discovered = mutagen_handler.discover_all_metadata(file_path)
-                    
-                    field_exists = (field_name in existing_metadata or 
-                                  field_name.upper() in existing_metadata or
-                                  field_name in all_discovered or
-                                  field_name.upper() in all_discovered)
+                    # Parse the file once for both the existence check and the write
+                    audio_file = mutagen_handler.open_file(file_path)
+                    existing_metadata, all_discovered = mutagen_handler.read_and_discover(file_path, audio_file, field_matcher)
+                    field_exists, old_value = find_existing_field(field_name, existing_metadata, all_discovered)
                     
                     # Determine appropriate value to write
-                    value_to_write = field_value
                     if not value_to_write:
-                        from core.file_utils import get_file_format
                         _, _, base_format = get_file_format(file_path)
                         if base_format not in ['flac', 'ogg', 'opus']:
                             value_to_write = ' '
                     
-                    if field_exists:
-                        # Get existing value for history
-                        old_value = (existing_metadata.get(field_name) or 
-                                   existing_metadata.get(field_name.upper()) or
-                                   all_discovered.get(field_name, {}).get('value') or
-                                   all_discovered.get(field_name.upper(), {}).get('value') or '')
-                        
-                        # Track as update
-                        action = create_metadata_action(file_path, field_name, old_value, value_to_write)
-                        history.add_action(action)
-                        files_to_update.append(file_path)
-                    else:
-                        # Track for batch creation
-                        files_to_create.append(file_path)
-                        create_values[file_path] = value_to_write
-                    
                     # Write the field
-                    success = mutagen_handler.write_custom_field(file_path, field_name, value_to_write)
-                    if success:
-                        if field_exists:
-                            results['filesUpdated'] += 1
-                        else:
-                            results['filesCreated'] += 1
-                    else:
-                        results['errors'].append(f"{os.path.basename(file_path)}: Failed to write field")
+                    if not mutagen_handler.write_custom_field(file_path, field_name, value_to_write, audio_file):
+                        return field_exists, old_value, value_to_write, f"{os.path.basename(file_path)}: Failed to write field"
+                    return field_exists, old_value, value_to_write, None
                         
                 except Exception as e:
-                    results['errors'].append(f"{os.path.basename(file_path)}: {str(e)}")
+                    return field_exists, old_value, value_to_write, f"{os.path.basename(file_path)}: {str(e)}"
+            
+            # Files are read and written concurrently; history and counts are
+            # merged afterwards, in directory order, on this thread
+            for file_path, (field_exists, old_value, value_to_write, error) in zip(audio_files, map_concurrently(create_in_file, audio_files)):
+                if field_exists is None:
+                    # Failed before the field could be checked
+                    results['errors'].append(error)
+                    continue
+                
+                if field_exists:
+                    # Track for batch update
+                    files_to_update.append((file_path, old_value, value_to_write))
+                else:
+                    # Track for batch creation
+                    files_to_create.append(file_path)
+                    create_values[file_path] = value_to_write
+                
+                if error:
+                    results['errors'].append(error)
+                elif field_exists:
+                    results['filesUpdated'] += 1
+                else:
+                    results['filesCreated'] += 1
+            
+            # Record updates as one undoable batch, like apply_field_to_folder does
+            batch_actions = []
+            if files_to_update:
+                batch_actions.append(create_batch_metadata_action(folder_path, field_name, field_value, files_to_update))
             
             # Create batch history action for new fields
             if files_to_create:
-                batch_action = create_batch_field_creation_action(files_to_create, field_name, create_values)
-                history.add_action(batch_action)
+                batch_actions.append(create_batch_field_creation_action(files_to_create, field_name, create_values))
+            
+            history.add_actions(batch_actions)
             
             # Determine overall status and message
             total_processed = results['filesCreated'] + results['filesUpdated']
@@ -1041,45 +1297,35 @@ def create_custom_field():
             else:
                 results['message'] = f"Created in {results['filesCreated']} files, updated in {results['filesUpdated']} files"
             
+            results.update(error_report(results['errors']))
             return jsonify(results)
             
         else:
             # Single file processing
             full_path = validate_path(os.path.join(MUSIC_DIR, filepath))
+            _, _, base_format = get_file_format(full_path)
             
             # Check if field already exists
-            existing_metadata = mutagen_handler.read_existing_metadata(full_path)
-            all_discovered = mutagen_handler.discover_all_metadata(full_path)
-            
-            field_exists = (field_name in existing_metadata or 
-                          field_name.upper() in existing_metadata or
-                          field_name in all_discovered or
-                          field_name.upper() in all_discovered)
+            # Parse the file once for both the existence check and the write
+            audio_file = mutagen_handler.open_file(full_path)
+            existing_metadata, all_discovered = mutagen_handler.read_and_discover(full_path, audio_file, field_key_matcher(field_name))
+            field_exists, old_value = find_existing_field(field_name, existing_metadata, all_discovered)
             
             
             # Handle empty values appropriately
             value_to_write = field_value
             if not value_to_write:
-                from core.file_utils import get_file_format
-                _, _, base_format = get_file_format(full_path)
                 if base_format not in ['flac', 'ogg', 'opus']:
                     value_to_write = ' '
             
             # Write the field
-            success = mutagen_handler.write_custom_field(full_path, field_name, value_to_write)
+            success = mutagen_handler.write_custom_field(full_path, field_name, value_to_write, audio_file)
             
             if success:
                 if field_exists:
                     # Track as update
-                    old_value = (existing_metadata.get(field_name) or 
-                               existing_metadata.get(field_name.upper()) or
-                               all_discovered.get(field_name, {}).get('value') or
-                               all_discovered.get(field_name.upper(), {}).get('value') or '')
-                    
                     # Determine the correct field identifier for history
                     history_field_name = field_name
-                    from core.file_utils import get_file_format
-                    _, _, base_format = get_file_format(full_path)
                     if base_format in ['mp3', 'wav']:
                         frame_id = mutagen_handler.normalize_field_name(field_name)
                         if frame_id:
@@ -1096,8 +1342,6 @@ def create_custom_field():
                     # Track as creation
                     # Determine the correct field identifier for history
                     history_field_name = field_name
-                    from core.file_utils import get_file_format
-                    _, _, base_format = get_file_format(full_path)
                     if base_format in ['mp3', 'wav']:
                         frame_id = mutagen_handler.normalize_field_name(field_name)
                         if frame_id:
@@ -1123,6 +1367,7 @@ def create_custom_field():
         return jsonify({'error': str(e)}), 500
 
 @app.route('/apply-art-to-folder', methods=['POST'])
+@serialize_writes
 def apply_art_to_folder():
     """Apply album art to all audio files in a folder"""
     data = request.json
@@ -1133,12 +1378,13 @@ def apply_art_to_folder():
         return jsonify({'error': 'No album art provided'}), 400
     
     # Get list of audio files
-    abs_folder_path = validate_path(os.path.join(MUSIC_DIR, folder_path) if folder_path else MUSIC_DIR)
-    audio_files = []
-    for filename in os.listdir(abs_folder_path):
-        file_path = os.path.join(abs_folder_path, filename)
-        if os.path.isfile(file_path) and filename.lower().endswith(AUDIO_EXTENSIONS):
-            audio_files.append(file_path)
+    try:
+        abs_folder_path = validate_path(os.path.join(MUSIC_DIR, folder_path) if folder_path else MUSIC_DIR)
+        audio_files = list_audio_files(abs_folder_path)
+    except ValueError:
+        return jsonify({'error': 'Invalid path'}), 403
+    except FileNotFoundError:
+        return jsonify({'error': 'Folder not found'}), 404
     
     # Prepare for batch changes
     file_changes = prepare_batch_album_art_change(folder_path, art_data, audio_files)
@@ -1147,7 +1393,8 @@ def apply_art_to_folder():
         apply_metadata_to_file(file_path, {}, art_data)
     
     # Use process_folder_files to handle the batch operation
-    response = process_folder_files(folder_path, apply_art, "updated with album art")
+    # Error paths come back as (response, status) tuples
+    response = make_response(process_folder_files(folder_path, apply_art, "updated with album art"))
     
     # Check if it's a successful response by examining the response data
     if response.status_code == 200:
@@ -1159,6 +1406,7 @@ def apply_art_to_folder():
     return response
 
 @app.route('/apply-field-to-folder', methods=['POST'])
+@serialize_writes
 def apply_field_to_folder():
     """Apply a specific metadata field to all audio files in a folder"""
     data = request.json
@@ -1169,87 +1417,60 @@ def apply_field_to_folder():
     if not field:
         return jsonify({'error': 'No field specified'}), 400
     
-    # Collect current values and categorize files
-    file_changes = []
-    files_to_create = []
-    create_values = {}
-    abs_folder_path = validate_path(os.path.join(MUSIC_DIR, folder_path) if folder_path else MUSIC_DIR)
+    # Current values are captured by the same pass that writes each file;
+    # workers finish in any order, so results are keyed by path
+    old_values = {}
+    created_files = []
     
-    for filename in os.listdir(abs_folder_path):
-        file_path = os.path.join(abs_folder_path, filename)
-        if os.path.isfile(file_path) and filename.lower().endswith(AUDIO_EXTENSIONS):
-            try:
-                # Check if field exists using both methods
-                existing_metadata = mutagen_handler.read_existing_metadata(file_path)
-                all_discovered = mutagen_handler.discover_all_metadata(file_path)
-                
-                # Check all case variations
-                field_lower = field.lower()
-                field_upper = field.upper()
-                
-                # For standard fields, check exact match
-                field_exists = (field in existing_metadata or 
-                              field_lower in existing_metadata or
-                              field_upper in existing_metadata or
-                              field in all_discovered or
-                              field_lower in all_discovered or
-                              field_upper in all_discovered)
-                
-                # For custom fields, also check format-specific representations with case variations
-                if not field_exists and field.lower() not in ['title', 'artist', 'album', 'albumartist', 'date', 'genre', 'track', 'disc', 'composer']:
-                    # Check if any discovered field matches case-insensitively
-                    for discovered_field in all_discovered.keys():
-                        # For format-specific fields, extract the actual field name
-                        actual_field_name = discovered_field
-                        if discovered_field.startswith('TXXX:'):
-                            actual_field_name = discovered_field[5:]
-                        elif discovered_field.startswith('WM/'):
-                            actual_field_name = discovered_field[3:]
-                        elif discovered_field.startswith('----:com.apple.iTunes:'):
-                            actual_field_name = discovered_field[22:]
-                        
-                        # Case-insensitive comparison
-                        if actual_field_name.lower() == field.lower():
-                            field_exists = True
-                            break
-                
-                if field_exists:
-                    # Get existing value for update tracking
-                    old_value = (existing_metadata.get(field) or 
-                               existing_metadata.get(field.upper()) or
-                               all_discovered.get(field, {}).get('value') or
-                               all_discovered.get(field.upper(), {}).get('value') or '')
-                    file_changes.append((file_path, old_value, value))
-                else:
-                    # Track for creation
-                    files_to_create.append(file_path)
-                    create_values[file_path] = value
-            except:
-                pass
+    # Only tags that could be this field need discovering in each file
+    field_matcher = field_key_matcher(field)
     
     def apply_field(file_path):
+        try:
+            # Check if field exists using both methods
+            existing_metadata, all_discovered = mutagen_handler.read_and_discover(file_path, key_filter=field_matcher)
+            scanned = find_existing_field(field, existing_metadata, all_discovered)
+        except Exception as e:
+            # Still attempt the write, but leave the file out of history
+            logger.warning(f"Error pre-scanning {os.path.basename(file_path)}: {str(e)}")
+            scanned = None
+        
         apply_metadata_to_file(file_path, {field: value})
+        
+        if scanned is not None:
+            field_exists, old_value = scanned
+            if field_exists:
+                old_values[file_path] = old_value
+            else:
+                created_files.append(file_path)
     
-    response = process_folder_files(folder_path, apply_field, f"updated with {field}")
+    # Error paths come back as (response, status) tuples
+    response = make_response(process_folder_files(folder_path, apply_field, f"updated with {field}"))
     
     # Check if it's a successful response by examining the response data
     if response.status_code == 200:
         response_data = response.get_json()
         if response_data.get('status') in ['success', 'partial']:
+            file_changes = [(file_path, old_value, value) for file_path, old_value in sorted(old_values.items())]
+            files_to_create = sorted(created_files)
+            create_values = {file_path: value for file_path in files_to_create}
+            
             # Add appropriate history actions
+            batch_actions = []
             if file_changes:
                 # Add batch metadata action for updates
-                action = create_batch_metadata_action(folder_path, field, value, file_changes)
-                history.add_action(action)
+                batch_actions.append(create_batch_metadata_action(folder_path, field, value, file_changes))
             
             if files_to_create:
                 # Add batch field creation action for new fields
-                batch_action = create_batch_field_creation_action(files_to_create, field, create_values)
-                history.add_action(batch_action)
+                batch_actions.append(create_batch_field_creation_action(files_to_create, field, create_values))
+            
+            history.add_actions(batch_actions)
     
     return response
 
 @app.route('/delete-field-from-folder', methods=['POST'])
+@serialize_writes
 def delete_field_from_folder():
     """Delete a metadata field from all audio files in a folder"""
     data = request.json
@@ -1260,48 +1481,39 @@ def delete_field_from_folder():
         return jsonify({'error': 'No field specified'}), 400
     
     try:
-        # Collect current values for history
-        file_changes = []
-        files_skipped = 0
-        abs_folder_path = validate_path(os.path.join(MUSIC_DIR, folder_path) if folder_path else MUSIC_DIR)
+        # Old values are captured as each file is deleted from, for history
+        old_values = {}
+        skipped_files = []
         
-        # Pre-scan files to check which have the field
-        for filename in os.listdir(abs_folder_path):
-            file_path = os.path.join(abs_folder_path, filename)
-            if os.path.isfile(file_path) and filename.lower().endswith(AUDIO_EXTENSIONS):
-                try:
-                    # Check file permissions first
-                    if not os.access(file_path, os.W_OK):
-                        raise PermissionError(f"No write permission for {filename}")
-                    
-                    all_fields = mutagen_handler.get_all_fields(file_path)
-                    metadata = mutagen_handler.read_metadata(file_path)
-                    
-                    # Check if field exists
-                    if field_id in all_fields or field_id in metadata:
-                        old_value = all_fields.get(field_id, {}).get('value', '') or metadata.get(field_id, '')
-                        file_changes.append((file_path, old_value))
-                    else:
-                        files_skipped += 1
-                except PermissionError:
-                    # Re-raise permission errors to be caught by process_folder_files
-                    raise
-                except Exception as e:
-                    logger.warning(f"Error pre-scanning {filename}: {str(e)}")
-                    continue
-        
-        # Process deletions
         def delete_field_from_file(file_path):
-            return mutagen_handler.delete_field(file_path, field_id)
+            # Check file permissions first
+            if not os.access(file_path, os.W_OK):
+                raise PermissionError(f"No write permission for {os.path.basename(file_path)}")
+            
+            # One parse serves the existence check, the old value and the delete
+            audio_file = mutagen_handler.open_file(file_path)
+            existing_metadata, all_fields = mutagen_handler.read_and_discover(file_path, audio_file)
+            
+            # Check if field exists (standard fields always count, as in the single-file delete)
+            if field_id not in all_fields and field_id not in existing_metadata and field_id not in STANDARD_FIELD_NAMES:
+                skipped_files.append(file_path)
+                return
+            
+            discovered = all_fields.get(field_id)
+            old_value = (discovered and discovered.get('value', '')) or existing_metadata.get(field_id, '')
+            if mutagen_handler.delete_field(file_path, field_id, audio_file):
+                old_values[file_path] = old_value
         
-        response = process_folder_files(folder_path, delete_field_from_file, f"deleted field {field_id}")
+        # Error paths come back as (response, status) tuples
+        response = make_response(process_folder_files(folder_path, delete_field_from_file, f"deleted field {field_id}"))
         
         # Add skipped files count to response
         if response.status_code == 200:
             response_data = response.get_json()
-            response_data['filesSkipped'] = files_skipped
+            response_data['filesSkipped'] = len(skipped_files)
             
-            # Record in history if successful
+            # Record in history if successful; workers finish in any order
+            file_changes = sorted(old_values.items())
             if response_data.get('status') in ['success', 'partial'] and file_changes:
                 action = create_batch_delete_field_action(folder_path, field_id, file_changes)
                 history.add_action(action)
@@ -1323,7 +1535,16 @@ def delete_field_from_folder():
 @app.route('/history')
 def get_history():
     """Get all editing history"""
-    return jsonify({'actions': history.get_all_actions()})
+    # Take the tag before the list, so a change in between can only make it stale
+    etag = history.get_state_tag()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify({'actions': history.get_all_actions()})
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    response.cache_control.private = True
+    return response
 
 @app.route('/history/<action_id>')
 def get_history_action(action_id):
@@ -1334,7 +1555,187 @@ def get_history_action(action_id):
     
     return jsonify(action.get_details())
 
+def restore_album_art(filepath, art_path, load_album_art=None):
+    """Put art saved in history back on a file, removing its art when there is none"""
+    art = (load_album_art or history.load_album_art)(art_path) if art_path else None
+    if art:
+        apply_metadata_to_file(filepath, {}, art)
+    else:
+        apply_metadata_to_file(filepath, {}, remove_art=True)
+
+def has_field_value(filepath, field, value):
+    """Check whether a standard field already holds value, so writing it would change nothing"""
+    # Custom fields are written unconditionally
+    if field not in STANDARD_FIELD_NAMES:
+        return False
+    return mutagen_handler.field_holds_value(filepath, field, value)
+
+def replay_metadata(action, values):
+    """Write one field back to the values recorded for each file"""
+    field = action.field
+    # Reading the tags is much cheaper than saving, which rewrites the file, so a
+    # single edit is checked first; batch files nearly always differ from the
+    # target, where the read would only add a parse before every write
+    check_current = action.action_type != ActionType.BATCH_METADATA
+    
+    def replay_file(filepath):
+        value = values.get(filepath, '')
+        if not (check_current and has_field_value(filepath, field, value)):
+            apply_metadata_to_file(filepath, {field: value})
+        return True
+    
+    return apply_to_files(replay_file, action.files)
+
+def replay_album_art(action, values):
+    """Put the recorded art back on each file"""
+    # Art files are named by content hash, so files that shared a cover
+    # share a path; read and encode each one once for this request
+    load_album_art = functools.lru_cache(maxsize=None)(history.load_album_art)
+    
+    def replay_file(filepath):
+        restore_album_art(filepath, values.get(filepath, ''), load_album_art)
+        return True
+    
+    return apply_to_files(replay_file, action.files)
+
+def remove_created_field(action):
+    """Delete a created field from each file"""
+    field, delete_field = action.field, mutagen_handler.delete_field
+    
+    def undo_file(filepath):
+        if not delete_field(filepath, field):
+            raise Exception("Failed to delete field")
+        return True
+    
+    return apply_to_files(undo_file, action.files)
+
+def undo_delete_field(action):
+    """Restore a deleted field on a single file"""
+    field, old_values = action.field, action.old_values
+    
+    def undo_file(filepath):
+        old_value = old_values[filepath]
+        if not has_field_value(filepath, field, old_value):
+            apply_metadata_to_file(filepath, {field: old_value})
+        return True
+    
+    return apply_to_files(undo_file, action.files)
+
+def undo_batch_delete_field(action):
+    """Restore a deleted field on every file that had a value"""
+    field, old_values = action.field, action.old_values
+    write_metadata = mutagen_handler.write_metadata
+    
+    def undo_file(filepath):
+        old_value = old_values.get(filepath, '')
+        if not old_value:
+            return False
+        return bool(write_metadata(filepath, {field: old_value}))
+    
+    return apply_to_files(undo_file, action.files)
+
+def redo_delete_field(action):
+    """Delete a field from a single file again"""
+    field = action.field
+    
+    def redo_file(filepath):
+        mutagen_handler.delete_field(filepath, field)
+        return True
+    
+    return apply_to_files(redo_file, action.files)
+
+def redo_batch_delete_field(action):
+    """Delete a field again from every file it was removed from"""
+    field, delete_field = action.field, mutagen_handler.delete_field
+    
+    def redo_file(filepath):
+        return bool(delete_field(filepath, field))
+    
+    return apply_to_files(redo_file, action.files)
+
+def redo_create_field(action):
+    """Recreate a custom field on each file"""
+    # For MP3/WAV files, reverse-map frame IDs to semantic names; it only
+    # depends on the field, so resolve it once for the whole action
+    field, new_values = action.field, action.new_values
+    id3_field = mutagen_handler.frame_to_field.get(field, field)
+    write_custom_field = mutagen_handler.write_custom_field
+    
+    def redo_file(filepath):
+        _, _, base_format = get_file_format(filepath)
+        target = id3_field if base_format in ['mp3', 'wav'] else field
+        
+        if not write_custom_field(filepath, target, new_values.get(filepath, '')):
+            raise Exception("Failed to recreate field")
+        return True
+    
+    return apply_to_files(redo_file, action.files)
+
+def undo_metadata(action):
+    """Undo metadata changes, field clears and batch edits"""
+    return replay_metadata(action, action.old_values)
+
+def redo_metadata(action):
+    """Redo metadata changes, field clears and batch edits"""
+    return replay_metadata(action, action.new_values)
+
+def undo_album_art(action):
+    """Undo album art changes and deletions"""
+    return replay_album_art(action, action.old_values)
+
+def redo_album_art(action):
+    """Redo album art changes and deletions"""
+    return replay_album_art(action, action.new_values)
+
+# Each handler takes the action and returns (files_updated, errors)
+UNDO_HANDLERS = {
+    ActionType.METADATA_CHANGE: undo_metadata,
+    ActionType.CLEAR_FIELD: undo_metadata,
+    ActionType.BATCH_METADATA: undo_metadata,
+    ActionType.ALBUM_ART_CHANGE: undo_album_art,
+    ActionType.ALBUM_ART_DELETE: undo_album_art,
+    ActionType.BATCH_ALBUM_ART: undo_album_art,
+    ActionType.DELETE_FIELD: undo_delete_field,
+    ActionType.BATCH_DELETE_FIELD: undo_batch_delete_field,
+    ActionType.CREATE_FIELD: remove_created_field,
+    ActionType.BATCH_CREATE_FIELD: remove_created_field,
+}
+
+REDO_HANDLERS = {
+    ActionType.METADATA_CHANGE: redo_metadata,
+    ActionType.CLEAR_FIELD: redo_metadata,
+    ActionType.BATCH_METADATA: redo_metadata,
+    ActionType.ALBUM_ART_CHANGE: redo_album_art,
+    ActionType.ALBUM_ART_DELETE: redo_album_art,
+    ActionType.BATCH_ALBUM_ART: redo_album_art,
+    ActionType.DELETE_FIELD: redo_delete_field,
+    ActionType.BATCH_DELETE_FIELD: redo_batch_delete_field,
+    ActionType.CREATE_FIELD: redo_create_field,
+    ActionType.BATCH_CREATE_FIELD: redo_create_field,
+}
+
+def replay_response(action, files_updated, errors, outcome):
+    """Build the undo/redo response; outcome is 'undone' or 'redone'"""
+    if files_updated == 0:
+        return jsonify({
+            'filesUpdated': 0,
+            'action': action.to_dict(),
+            'status': 'error',
+            'error': f'No files were {outcome}',
+            **error_report(errors)
+        }), 500
+    
+    response_data = {
+        'filesUpdated': files_updated,
+        'action': action.to_dict(),
+        'status': 'partial' if errors else 'success'
+    }
+    if errors:
+        response_data.update(error_report(errors))
+    return jsonify(response_data)
+
 @app.route('/history/<action_id>/undo', methods=['POST'])
+@serialize_writes
 def undo_action(action_id):
     """Undo a specific action"""
     action = history.get_action(action_id)
@@ -1345,143 +1746,19 @@ def undo_action(action_id):
         return jsonify({'error': 'Action is already undone'}), 400
     
     try:
-        errors = []
-        files_updated = 0
-        
-        if action.action_type in [ActionType.METADATA_CHANGE, ActionType.CLEAR_FIELD]:
-            # Undo single metadata change or field clear
-            filepath = action.files[0]
-            field = action.field
-            old_value = action.old_values[filepath]
-            
-            try:
-                apply_metadata_to_file(filepath, {field: old_value})
-                files_updated += 1
-            except Exception as e:
-                errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-        
-        elif action.action_type == ActionType.BATCH_METADATA:
-            # Undo batch metadata changes
-            for filepath in action.files:
-                try:
-                    old_value = action.old_values.get(filepath, '')
-                    apply_metadata_to_file(filepath, {action.field: old_value})
-                    files_updated += 1
-                except Exception as e:
-                    errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-
-        elif action.action_type in [ActionType.ALBUM_ART_CHANGE, ActionType.ALBUM_ART_DELETE]:
-            # Undo album art change
-            filepath = action.files[0]
-            old_art_path = action.old_values[filepath]
-            
-            try:
-                if old_art_path:
-                    old_art = history.load_album_art(old_art_path)
-                    if old_art:
-                        apply_metadata_to_file(filepath, {}, old_art)
-                    else:
-                        apply_metadata_to_file(filepath, {}, remove_art=True)
-                else:
-                    apply_metadata_to_file(filepath, {}, remove_art=True)
-                files_updated += 1
-            except Exception as e:
-                errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-        
-        elif action.action_type == ActionType.BATCH_ALBUM_ART:
-            # Undo batch album art changes
-            for filepath in action.files:
-                try:
-                    old_art_path = action.old_values.get(filepath, '')
-                    if old_art_path:
-                        old_art = history.load_album_art(old_art_path)
-                        if old_art:
-                            apply_metadata_to_file(filepath, {}, old_art)
-                        else:
-                            apply_metadata_to_file(filepath, {}, remove_art=True)
-                    else:
-                        apply_metadata_to_file(filepath, {}, remove_art=True)
-                    files_updated += 1
-                except Exception as e:
-                    errors.append(f"{os.path.basename(filepath)}: {str(e)}")
+        files_updated, errors = UNDO_HANDLERS[action.action_type](action)
         
-        elif action.action_type == ActionType.DELETE_FIELD:
-            # Undo field deletion by restoring the field
-            filepath = action.files[0]
-            field = action.field
-            old_value = action.old_values[filepath]
-            
-            try:
-                apply_metadata_to_file(filepath, {field: old_value})
-                files_updated += 1
-            except Exception as e:
-                errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-        
-        elif action.action_type == ActionType.BATCH_DELETE_FIELD:
-            # Undo batch field deletion by restoring fields
-            for filepath in action.files:
-                try:
-                    old_value = action.old_values.get(filepath, '')
-                    if old_value:
-                        success = mutagen_handler.write_metadata(filepath, {action.field: old_value})
-                        if success:
-                            files_updated += 1
-                except Exception as e:
-                    errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-        
-        elif action.action_type == ActionType.CREATE_FIELD:
-            # Undo field creation by deleting the field
-            filepath = action.files[0]
-            field = action.field
-            
-            try:
-                success = mutagen_handler.delete_field(filepath, field)
-                if success:
-                    files_updated += 1
-                else:
-                    errors.append(f"{os.path.basename(filepath)}: Failed to delete field")
-            except Exception as e:
-                errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-        
-        elif action.action_type == ActionType.BATCH_CREATE_FIELD:
-            # Undo batch field creation
-            for filepath in action.files:
-                try:
-                    success = mutagen_handler.delete_field(filepath, action.field)
-                    if success:
-                        files_updated += 1
-                    else:
-                        errors.append(f"{os.path.basename(filepath)}: Failed to delete field")
-                except Exception as e:
-                    errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-
         # Mark as undone
-        action.is_undone = True
+        history.set_undone(action, True)
         
-        # Return result
-        response_data = {
-            'filesUpdated': files_updated,
-            'action': action.to_dict()
-        }
-        
-        if files_updated == 0:
-            response_data['status'] = 'error'
-            response_data['error'] = 'No files were undone'
-            response_data['errors'] = errors
-            return jsonify(response_data), 500
-        elif errors:
-            response_data['status'] = 'partial'
-            response_data['errors'] = errors
-            return jsonify(response_data)
-        else:
-            response_data['status'] = 'success'
-            return jsonify(response_data)
+        return replay_response(action, files_updated, errors, 'undone')
     
     except Exception as e:
         logger.error(f"Error undoing action {action_id}: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/history/<action_id>/redo', methods=['POST'])
+@serialize_writes
 def redo_action(action_id):
     """Redo a previously undone action"""
     action = history.get_action(action_id)
@@ -1492,161 +1769,19 @@ def redo_action(action_id):
         return jsonify({'error': 'Action is not undone'}), 400
     
     try:
-        errors = []
-        files_updated = 0
-        
-        if action.action_type in [ActionType.METADATA_CHANGE, ActionType.CLEAR_FIELD]:
-            # Redo single metadata change or field clear
-            filepath = action.files[0]
-            field = action.field
-            new_value = action.new_values[filepath]
-            
-            try:
-                apply_metadata_to_file(filepath, {field: new_value})
-                files_updated += 1
-            except Exception as e:
-                errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-        
-        elif action.action_type == ActionType.BATCH_METADATA:
-            # Redo batch metadata changes
-            for filepath in action.files:
-                try:
-                    new_value = action.new_values.get(filepath, '')
-                    apply_metadata_to_file(filepath, {action.field: new_value})
-                    files_updated += 1
-                except Exception as e:
-                    errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-
-        elif action.action_type in [ActionType.ALBUM_ART_CHANGE, ActionType.ALBUM_ART_DELETE]:
-            # Redo album art change
-            filepath = action.files[0]
-            new_art_path = action.new_values[filepath]
-            
-            try:
-                if new_art_path:
-                    new_art = history.load_album_art(new_art_path)
-                    if new_art:
-                        apply_metadata_to_file(filepath, {}, new_art)
-                    else:
-                        apply_metadata_to_file(filepath, {}, remove_art=True)
-                else:
-                    apply_metadata_to_file(filepath, {}, remove_art=True)
-                files_updated += 1
-            except Exception as e:
-                errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-        
-        elif action.action_type == ActionType.BATCH_ALBUM_ART:
-            # Redo batch album art changes
-            for filepath in action.files:
-                try:
-                    new_art_path = action.new_values.get(filepath, '')
-                    if new_art_path:
-                        new_art = history.load_album_art(new_art_path)
-                        if new_art:
-                            apply_metadata_to_file(filepath, {}, new_art)
-                        else:
-                            apply_metadata_to_file(filepath, {}, remove_art=True)
-                    else:
-                        apply_metadata_to_file(filepath, {}, remove_art=True)
-                    files_updated += 1
-                except Exception as e:
-                    errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-        
-        elif action.action_type == ActionType.DELETE_FIELD:
-            # Redo field deletion by deleting the field again
-            filepath = action.files[0]
-            field = action.field
-            
-            try:
-                mutagen_handler.delete_field(filepath, field)
-                files_updated += 1
-            except Exception as e:
-                errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-        
-        elif action.action_type == ActionType.BATCH_DELETE_FIELD:
-            # Redo batch field deletion
-            for filepath in action.files:
-                try:
-                    success = mutagen_handler.delete_field(filepath, action.field)
-                    if success:
-                        files_updated += 1
-                except Exception as e:
-                    errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-        
-        elif action.action_type == ActionType.CREATE_FIELD:
-            # Redo field creation
-            filepath = action.files[0]
-            field = action.field
-            value = action.new_values[filepath]
-            
-            # For MP3/WAV files, reverse-map frame IDs to semantic names
-            from core.file_utils import get_file_format
-            _, _, base_format = get_file_format(filepath)
-            
-            if base_format in ['mp3', 'wav']:
-                # Check if this is a frame ID that needs to be converted back
-                if field in mutagen_handler.frame_to_field:
-                    field = mutagen_handler.frame_to_field[field]
-            
-            try:
-                success = mutagen_handler.write_custom_field(filepath, field, value)
-                if success:
-                    files_updated += 1
-                else:
-                    errors.append(f"{os.path.basename(filepath)}: Failed to recreate field")
-            except Exception as e:
-                errors.append(f"{os.path.basename(filepath)}: {str(e)}")
+        files_updated, errors = REDO_HANDLERS[action.action_type](action)
         
-        elif action.action_type == ActionType.BATCH_CREATE_FIELD:
-            # Redo batch field creation
-            for filepath in action.files:
-                try:
-                    value = action.new_values.get(filepath, '')
-                    field = action.field
-                    
-                    # Apply same reverse mapping for MP3/WAV files
-                    from core.file_utils import get_file_format
-                    _, _, base_format = get_file_format(filepath)
-                    
-                    if base_format in ['mp3', 'wav']:
-                        if field in mutagen_handler.frame_to_field:
-                            field = mutagen_handler.frame_to_field[field]
-                    
-                    success = mutagen_handler.write_custom_field(filepath, field, value)
-                    if success:
-                        files_updated += 1
-                    else:
-                        errors.append(f"{os.path.basename(filepath)}: Failed to recreate field")
-                except Exception as e:
-                    errors.append(f"{os.path.basename(filepath)}: {str(e)}")
-
         # Mark as not undone
-        action.is_undone = False
-        
-        # Return result
-        response_data = {
-            'filesUpdated': files_updated,
-            'action': action.to_dict()
-        }
+        history.set_undone(action, False)
         
-        if files_updated == 0:
-            response_data['status'] = 'error'
-            response_data['error'] = 'No files were redone'
-            response_data['errors'] = errors
-            return jsonify(response_data), 500
-        elif errors:
-            response_data['status'] = 'partial'
-            response_data['errors'] = errors
-            return jsonify(response_data)
-        else:
-            response_data['status'] = 'success'
-            return jsonify(response_data)
+        return replay_response(action, files_updated, errors, 'redone')
     
     except Exception as e:
         logger.error(f"Error redoing action {action_id}: {e}")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/history/clear', methods=['POST'])
+@serialize_writes
 def clear_history():
     """Clear all editing history"""
     try:
@@ -1669,14 +1804,13 @@ def infer_metadata_field(filename, field):
     try:
         filepath = validate_path(os.path.join(MUSIC_DIR, filename))
         
+        # Validate field (only the standard fields can be inferred) before touching the disk
+        if field not in STANDARD_FIELD_NAMES:
+            return jsonify({'error': 'Invalid field'}), 400
+        
         if not os.path.exists(filepath):
             return jsonify({'error': 'File not found'}), 404
         
-        # Validate field
-        valid_fields = ['title', 'artist', 'album', 'albumartist', 'date', 'genre', 'track', 'disc', 'composer']
-        if field not in valid_fields:
-            return jsonify({'error': 'Invalid field'}), 400
-        
         # Get existing metadata
         existing_metadata = read_metadata(filepath)
         
@@ -1684,16 +1818,21 @@ def infer_metadata_field(filename, field):
         folder_path = os.path.dirname(filepath)
         sibling_files = []
         try:
-            for fn in os.listdir(folder_path):
-                if fn.lower().endswith(AUDIO_EXTENSIONS):
-                    sibling_files.append({'name': fn, 'path': os.path.join(folder_path, fn)})
-        except:
+            # DirEntry carries the joined path and file type from the listing
+            with os.scandir(folder_path) as entries:
+                sibling_files = [{'name': entry.name, 'path': entry.path}
+                                 for entry in entries
+                                 if is_audio_file(entry.name) and entry.is_file()]
+        except OSError:
             pass
         
         folder_context = {
             'files': sibling_files
         }
         
+        # Import on first use so workers that never infer skip loading the engine
+        from core.inference import inference_engine
+        
         # Run inference
         suggestions = inference_engine.infer_field(filepath, field, existing_metadata, folder_context)
         
@@ -1717,4 +1856,5 @@ if __name__ == '__main__':
     # This block will only run during development
     # In production, Gunicorn will import 'app' directly
     logger.warning("Running in development mode. Use Gunicorn for production!")
-    app.run(host=HOST, port=PORT, debug=False)
+    # Serve each request on its own thread so a long audio stream doesn't block API calls
+    app.run(host=HOST, port=PORT, debug=False, threaded=True)
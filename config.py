@@ -18,6 +18,7 @@
 Configuration and constants for Metadata Remote
 """
 import os
+import tempfile
 
 # Directory configuration
 MUSIC_DIR = os.environ.get('MUSIC_DIR', '/music')
@@ -34,6 +35,17 @@ HOST = os.environ.get('HOST', '::')
 AUDIO_EXTENSIONS = (
     '.mp3', '.flac', '.wav', '.m4a', '.m4b', '.wma', '.wv', '.ogg', '.opus'  # MODIFIED: Added M4B to array
 )
+# Extensions without the leading dot, for O(1) lookups when filtering directory listings
+AUDIO_EXTENSION_NAMES = frozenset(ext.lstrip('.') for ext in AUDIO_EXTENSIONS)
+
+# Worker threads for per-file batch operations (I/O bound, so oversubscribe the CPUs)
+BATCH_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Per-file error messages included in a batch response; the rest are only counted
+MAX_REPORTED_ERRORS = int(os.environ.get('MAX_REPORTED_ERRORS', '100'))
+
+# Skip importing mutagen's format modules at startup (they then load on the first metadata read)
+LAZY_WARMUP = os.environ.get('LAZY_WARMUP', 'false').lower() in ['true', '1', 'yes']
 
 # File display configuration
 SHOW_HIDDEN_FILES = os.environ.get('SHOW_HIDDEN_FILES', 'false').lower() in ['true', '1', 'yes']
@@ -51,20 +63,30 @@ MIME_TYPES = {
     '.opus': 'audio/opus'
 }
 
+# Seconds a browser may reuse a streamed file before revalidating it (0 = always revalidate)
+STREAM_CACHE_MAX_AGE = int(os.environ.get('STREAM_CACHE_MAX_AGE', '0'))
+
+# WavPack playback: decoded WAVs are cached on disk, least recently played evicted first
+WAV_CACHE_DIR = os.environ.get('WAV_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'metadata_remote_wav_cache'))
+WAV_CACHE_MAX_BYTES = int(os.environ.get('WAV_CACHE_MAX_MB', '1024')) * 1024 * 1024
+# Seconds a single wvunpack decode may run before it is killed
+WAV_DECODE_TIMEOUT = int(os.environ.get('WAV_DECODE_TIMEOUT', '300'))
+
 # Format-specific metadata handling
+# Values are sets: they are only ever used for membership tests
 FORMAT_METADATA_CONFIG = {
     # Formats that typically use uppercase tags
-    'uppercase': ['mp3'],
+    'uppercase': frozenset({'mp3'}),
     # Formats that typically use lowercase tags
-    'lowercase': ['flac'],
+    'lowercase': frozenset({'flac'}),
     # Formats that use specific tag systems
-    'itunes': ['m4a', 'm4b'],
+    'itunes': frozenset({'m4a', 'm4b'}),
     # Formats with limited metadata support
-    'limited': ['wav'],
+    'limited': frozenset({'wav'}),
     # Formats that don't support embedded album art
-    'no_embedded_art': ['wav', 'wv'],  # WAV and WavPack don't support embedded art
+    'no_embedded_art': frozenset({'wav', 'wv'}),  # WAV and WavPack don't support embedded art
     # Formats that store metadata at stream level
-    'stream_level_metadata': ['opus']
+    'stream_level_metadata': frozenset({'opus'})
 }
 
 # History configuration
@@ -72,6 +94,7 @@ MAX_HISTORY_ITEMS = 1000
 
 # Inference engine configuration
 INFERENCE_CACHE_DURATION = 3600  # 1 hour
+INFERENCE_RESULT_CACHE_SIZE = 4096  # Max memoized infer_field results
 MUSICBRAINZ_RATE_LIMIT = 1.0  # 1 request per second
 MUSICBRAINZ_USER_AGENT = 'Metadata-Remote/1.0 (https://github.com/wow-signal-dev/metadata-remote)'
 
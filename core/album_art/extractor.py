@@ -36,7 +36,7 @@ def extract_album_art(filepath):
     """
     # Check if format supports album art
     _, _, base_format = get_file_format(filepath)
-    if base_format in FORMAT_METADATA_CONFIG.get('no_embedded_art', []):
+    if base_format in FORMAT_METADATA_CONFIG.get('no_embedded_art', ()):
         return None
     
     try:
@@ -20,10 +20,28 @@ Handles bulk operations on all files in a folder
 """
 import os
 import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from flask import jsonify
 
-from config import MUSIC_DIR, AUDIO_EXTENSIONS, logger
-from core.file_utils import validate_path
+from config import MUSIC_DIR, BATCH_MAX_WORKERS, MAX_REPORTED_ERRORS, logger
+from core.file_utils import validate_path, iter_audio_files
+
+def error_report(errors):
+    """
+    Build the errors part of a batch response
+    
+    Args:
+        errors: Per-file error messages
+        
+    Returns:
+        Dict with the first MAX_REPORTED_ERRORS messages under 'errors' and,
+        when some were left out, their number under 'errorsTruncated'
+    """
+    report = {'errors': errors[:MAX_REPORTED_ERRORS]}
+    if len(errors) > MAX_REPORTED_ERRORS:
+        report['errorsTruncated'] = len(errors) - MAX_REPORTED_ERRORS
+    return report
 
 def process_folder_files(folder_path, process_func, process_name):
     """
@@ -43,41 +61,46 @@ def process_folder_files(folder_path, process_func, process_name):
         if not os.path.exists(abs_folder_path):
             return jsonify({'error': 'Folder not found'}), 404
         
-        # Get all audio files in the folder (not subfolders)
-        audio_files = []
-        for filename in os.listdir(abs_folder_path):
-            file_path = os.path.join(abs_folder_path, filename)
-            if os.path.isfile(file_path) and filename.lower().endswith(AUDIO_EXTENSIONS):
-                audio_files.append(file_path)
-        
-        if not audio_files:
-            return jsonify({'error': 'No audio files found in folder'}), 404
-        
-        files_updated = 0
-        errors = []
-        
-        # Process each file
-        for file_path in audio_files:
-            filename = os.path.basename(file_path)
+        def process_file(file_path):
+            """Run process_func on one file, returning an error message on failure"""
             try:
                 process_func(file_path)
-                files_updated += 1
+                return None
             except Exception as e:
+                filename = os.path.basename(file_path)
                 logger.error(f"Error processing {filename}: {e}")
-                errors.append(f"{filename}: {str(e)}")
+                return f"{filename}: {str(e)}"
+        
+        # Each file is independent, so overlap their disk I/O across worker threads.
+        # Files are handed out while the directory is still being listed, with a
+        # bounded number in flight; results are collected in listing order
+        outcomes = []
+        with ThreadPoolExecutor(max_workers=BATCH_MAX_WORKERS) as executor:
+            pending = deque()
+            for file_path in iter_audio_files(abs_folder_path):
+                pending.append(executor.submit(process_file, file_path))
+                if len(pending) >= BATCH_MAX_WORKERS * 2:
+                    outcomes.append(pending.popleft().result())
+            outcomes.extend(future.result() for future in pending)
+        
+        if not outcomes:
+            return jsonify({'error': 'No audio files found in folder'}), 404
+        
+        errors = [error for error in outcomes if error]
+        files_updated = len(outcomes) - len(errors)
         
         # Return results
         if files_updated == 0:
             return jsonify({
                 'status': 'error',
                 'error': f'No files were {process_name}',
-                'errors': errors
+                **error_report(errors)
             }), 500
         elif errors:
             return jsonify({
                 'status': 'partial',
                 'filesUpdated': files_updated,
-                'errors': errors
+                **error_report(errors)
             })
         else:
             return jsonify({
@@ -19,18 +19,96 @@ File system utilities for Metadata Remote
 Handles path validation, file ownership, and format detection
 """
 import os
+import errno
+import shutil
 import logging
+import functools
 from pathlib import Path
 
-from config import MUSIC_DIR, OWNER_UID, OWNER_GID, FORMAT_METADATA_CONFIG, logger
+from config import MUSIC_DIR, OWNER_UID, OWNER_GID, FORMAT_METADATA_CONFIG, AUDIO_EXTENSION_NAMES, logger
 
+# MUSIC_DIR is fixed for the life of the process, so normalize it once
+MUSIC_DIR_ABS = os.path.abspath(MUSIC_DIR)
+# Trailing separator, so a sibling like /music2 doesn't pass as inside /music
+MUSIC_DIR_PREFIX = os.path.join(MUSIC_DIR_ABS, '')
+
+@functools.lru_cache(maxsize=8192)
 def validate_path(filepath):
     """Validate that a path is within MUSIC_DIR"""
+    # Null bytes can never name a file; reject them before doing any path work
+    if '\0' in filepath:
+        raise ValueError("Invalid path")
+    
+    # Pure string normalization with no filesystem access, so results stay valid
+    # across renames/deletes and can be cached (rejections raise and aren't cached)
     abs_path = os.path.abspath(filepath)
-    if not abs_path.startswith(os.path.abspath(MUSIC_DIR)):
+    if abs_path != MUSIC_DIR_ABS and not abs_path.startswith(MUSIC_DIR_PREFIX):
         raise ValueError("Invalid path")
     return abs_path
 
+def is_audio_file(filename):
+    """Check whether a filename has a supported audio extension"""
+    # Only the extension is lowercased, not the whole name
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in AUDIO_EXTENSION_NAMES
+
+def iter_audio_files(folder_path):
+    """Yield full paths of the audio files directly inside folder_path (not subfolders) as they are listed"""
+    # DirEntry.is_file() answers from the directory listing itself; it only
+    # stats for symlinks, which are followed so linked tracks still count
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if is_audio_file(entry.name) and entry.is_file():
+                yield entry.path
+
+def list_audio_files(folder_path):
+    """List full paths of the audio files directly inside folder_path (not subfolders)"""
+    return list(iter_audio_files(folder_path))
+
+def list_audio_files_relative(folder_path):
+    """List audio files anywhere under folder_path, as paths relative to it"""
+    rel_files = []
+    prefix_len = len(os.path.join(folder_path, ''))
+    for root, dirs, files in os.walk(folder_path):
+        # os.walk builds each root by joining onto folder_path, so slicing off the
+        # prefix once per directory replaces a relpath() call per file
+        rel_root = root[prefix_len:]
+        for file in files:
+            if is_audio_file(file):
+                rel_files.append(os.path.join(rel_root, file))
+    return rel_files
+
+def copy_file_fast(src, dst):
+    """Copy a file like shutil.copy2, letting the kernel copy (or reflink) the data when it can"""
+    if hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            shutil.copystat(src, dst)
+            return dst
+        except OSError as e:
+            # Unsupported between these filesystems; fall back to a regular copy
+            if e.errno not in (errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EOPNOTSUPP):
+                raise
+    return shutil.copy2(src, dst)
+
+def move_folder_tree(source_path, dest_path):
+    """Move a folder, renaming it in place when possible and copying across mounts otherwise"""
+    try:
+        os.rename(source_path, dest_path)
+    except OSError as e:
+        if e.errno != errno.EXDEV:
+            raise
+        # Different mounts (e.g. separate bind mounts of one filesystem): copy then delete
+        logger.info(f"Copying {source_path} across filesystems")
+        shutil.copytree(source_path, dest_path, symlinks=True, copy_function=copy_file_fast)
+        shutil.rmtree(source_path)
+
 def fix_file_ownership(filepath):
     """Fix file ownership to match Jellyfin's expected user"""
     try:
@@ -61,6 +139,6 @@ def get_file_format(filepath):
         output_format = base_format
     
     # Determine tag case preference
-    use_uppercase = base_format in FORMAT_METADATA_CONFIG.get('uppercase', [])
+    use_uppercase = base_format in FORMAT_METADATA_CONFIG.get('uppercase', ())
     
     return output_format, use_uppercase, base_format
@@ -22,12 +22,13 @@ import time
 import uuid
 import base64
 import hashlib
+import itertools
 import logging
 import tempfile
 import threading
 from dataclasses import dataclass
 from enum import Enum
-from typing import Dict, List, Tuple, Optional, Any
+from typing import Dict, List, Set, Tuple, Optional, Any
 
 from config import MAX_HISTORY_ITEMS, logger
 
@@ -35,6 +36,15 @@ from config import MAX_HISTORY_ITEMS, logger
 # EDITING HISTORY SYSTEM
 # ======================
 
+# Action IDs are a per-process random prefix plus a lock-free counter, so IDs
+# stay unique across restarts without an os.urandom call per action
+_ACTION_ID_PREFIX = uuid.uuid4().hex[:12]
+_action_counter = itertools.count(1)
+
+def _next_action_id() -> str:
+    """Return a unique ID for a new history action"""
+    return f"{_ACTION_ID_PREFIX}-{next(_action_counter)}"
+
 class ActionType(Enum):
     """Types of actions that can be performed"""
     METADATA_CHANGE = "metadata_change"
@@ -48,6 +58,9 @@ class ActionType(Enum):
     CREATE_FIELD = "create_field"
     BATCH_CREATE_FIELD = "batch_create_field"
 
+# Actions whose old/new values are paths to album art files in the temp directory
+ART_ACTION_TYPES = frozenset([ActionType.ALBUM_ART_CHANGE, ActionType.ALBUM_ART_DELETE, ActionType.BATCH_ALBUM_ART])
+
 @dataclass
 class HistoryAction:
     """Represents a single action in the editing history"""
@@ -91,7 +104,7 @@ class HistoryAction:
                 details['changes'].append(change)
             if len(self.files) > 10:
                 details['more_files'] = len(self.files) - 10
-        elif self.action_type in [ActionType.ALBUM_ART_CHANGE, ActionType.ALBUM_ART_DELETE, ActionType.BATCH_ALBUM_ART]:
+        elif self.action_type in ART_ACTION_TYPES:
             details['has_old_art'] = any(self.old_values.values())
             details['has_new_art'] = any(self.new_values.values())
             
@@ -103,6 +116,8 @@ class EditingHistory:
     def __init__(self):
         self.actions: List[HistoryAction] = []
         self.lock = threading.Lock()
+        # Bumped on every change to what get_all_actions returns
+        self.version = 0
         
         # Create temp directory for storing album art
         self.temp_dir = tempfile.mkdtemp(prefix='metadata_remote_history_')
@@ -110,19 +125,37 @@ class EditingHistory:
     
     def add_action(self, action: HistoryAction):
         """Add a new action to the history"""
+        self.add_actions([action])
+    
+    def add_actions(self, actions: List[HistoryAction]):
+        """Add several actions under one lock acquisition, so they stay adjacent in the history"""
         with self.lock:
-            self.actions.append(action)
+            self.actions.extend(actions)
+            self.version += 1
             # Keep only last N actions to prevent memory issues
-            if len(self.actions) > MAX_HISTORY_ITEMS:
-                # Clean up old album art files if any
-                old_action = self.actions.pop(0)
-                self._cleanup_action_files(old_action)
+            excess = len(self.actions) - MAX_HISTORY_ITEMS
+            if excess > 0:
+                old_actions = self.actions[:excess]
+                del self.actions[:excess]
+                # Clean up old album art files if any; files are named by content
+                # hash, so keep the ones a remaining action still points at
+                self._remove_art_files(self._art_paths(old_actions) - self._art_paths(self.actions))
     
     def get_all_actions(self):
         """Get all actions in reverse chronological order"""
         with self.lock:
             return [action.to_dict() for action in reversed(self.actions)]
     
+    def get_state_tag(self) -> str:
+        """Get a tag that changes whenever the action list does, unique to this process"""
+        return f"{_ACTION_ID_PREFIX}-{self.version}"
+    
+    def set_undone(self, action: HistoryAction, is_undone: bool):
+        """Mark an action as undone or redone"""
+        with self.lock:
+            action.is_undone = is_undone
+            self.version += 1
+    
     def get_action(self, action_id: str) -> Optional[HistoryAction]:
         """Get a specific action by ID"""
         with self.lock:
@@ -137,14 +170,15 @@ class EditingHistory:
             return ''
         
         # Generate unique filename
-        art_hash = hashlib.md5(art_data.encode()).hexdigest()
+        art_hash = hashlib.blake2b(art_data.encode(), digest_size=16).hexdigest()
         art_path = os.path.join(self.temp_dir, f"{art_hash}.jpg")
         
         # Save only if not already exists
         if not os.path.exists(art_path):
             try:
-                # Decode base64 data
-                art_bytes = base64.b64decode(art_data.split(',')[1] if ',' in art_data else art_data)
+                # Decode base64 data, removing any data URI prefix
+                prefix, separator, payload = art_data.partition(',')
+                art_bytes = base64.b64decode(payload if separator else prefix)
                 with open(art_path, 'wb') as f:
                     f.write(art_bytes)
             except Exception as e:
@@ -166,25 +200,27 @@ class EditingHistory:
             logger.error(f"Error loading album art: {e}")
             return None
     
-    def _cleanup_action_files(self, action: HistoryAction):
-        """Clean up any temporary files associated with an action"""
-        if action.action_type in [ActionType.ALBUM_ART_CHANGE, ActionType.ALBUM_ART_DELETE, ActionType.BATCH_ALBUM_ART]:
-            # Clean up old album art files
-            for art_path in action.old_values.values():
-                if art_path and os.path.exists(art_path):
-                    try:
-                        os.remove(art_path)
-                    except:
-                        pass
-            for art_path in action.new_values.values():
-                if art_path and os.path.exists(art_path):
-                    try:
-                        os.remove(art_path)
-                    except:
-                        pass
+    def _art_paths(self, actions: List[HistoryAction]) -> Set[str]:
+        """Collect the album art files referenced by actions"""
+        art_paths = set()
+        for action in actions:
+            if action.action_type in ART_ACTION_TYPES:
+                art_paths.update(action.old_values.values())
+                art_paths.update(action.new_values.values())
+        art_paths.discard('')
+        return art_paths
     
-    def __del__(self):
-        """Clean up temp directory on exit"""
+    def _remove_art_files(self, art_paths: Set[str]):
+        """Delete album art files from the temp directory"""
+        # A batch shares one file across many entries, so each path is removed once
+        for art_path in art_paths:
+            try:
+                os.remove(art_path)
+            except OSError:
+                pass
+    
+    def cleanup(self):
+        """Remove the temp directory holding album art snapshots"""
         try:
             import shutil
             if hasattr(self, 'temp_dir') and os.path.exists(self.temp_dir):
@@ -192,51 +228,45 @@ class EditingHistory:
                 logger.info(f"Cleaned up temp directory: {self.temp_dir}")
         except:
             pass
+    
+    def __del__(self):
+        """Clean up temp directory on exit"""
+        self.cleanup()
         
     def clear(self):
         """Clear all history and clean up associated files"""
         with self.lock:
             # Clean up all temporary files
-            for action in self.actions:
-                self._cleanup_action_files(action)
+            self._remove_art_files(self._art_paths(self.actions))
             
             # Clear the actions list
             self.actions.clear()
+            self.version += 1
             
             logger.info("Cleared all editing history")
 
     def update_file_references(self, old_path: str, new_path: str):
         """Update all actions that reference a file when it gets renamed"""
+        self._remap_file_references(lambda filepath: new_path if filepath == old_path else filepath)
+        logger.info(f"Updated file references from {old_path} to {new_path} in history")
+    
+    def rename_prefix(self, old_prefix: str, new_prefix: str):
+        """Update all actions that reference files under a renamed or moved folder"""
+        # Prefixes should end with os.sep so a sibling like "Album 2" isn't matched by "Album"
+        prefix_len = len(old_prefix)
+        self._remap_file_references(
+            lambda filepath: new_prefix + filepath[prefix_len:] if filepath.startswith(old_prefix) else filepath
+        )
+        logger.info(f"Updated file references under {old_prefix} to {new_prefix} in history")
+    
+    def _remap_file_references(self, remap):
+        """Rewrite file paths in every action's files list and value keys (not values)"""
         with self.lock:
             for action in self.actions:
-                # Update files list
-                updated_files = []
-                for filepath in action.files:
-                    if filepath == old_path:
-                        updated_files.append(new_path)
-                    else:
-                        updated_files.append(filepath)
-                action.files = updated_files
-                
-                # Update old_values keys (not values)
-                updated_old_values = {}
-                for filepath, value in action.old_values.items():
-                    if filepath == old_path:
-                        updated_old_values[new_path] = value
-                    else:
-                        updated_old_values[filepath] = value
-                action.old_values = updated_old_values
-                
-                # Update new_values keys (not values)
-                updated_new_values = {}
-                for filepath, value in action.new_values.items():
-                    if filepath == old_path:
-                        updated_new_values[new_path] = value
-                    else:
-                        updated_new_values[filepath] = value
-                action.new_values = updated_new_values
-                
-        logger.info(f"Updated file references from {old_path} to {new_path} in history")
+                action.files = [remap(filepath) for filepath in action.files]
+                action.old_values = {remap(filepath): value for filepath, value in action.old_values.items()}
+                action.new_values = {remap(filepath): value for filepath, value in action.new_values.items()}
+            self.version += 1
 
 # =====================================
 # HELPER FUNCTIONS FOR HISTORY TRACKING
@@ -270,7 +300,7 @@ def create_metadata_action(filepath: str, field: str, old_value: str, new_value:
         action_type_enum = ActionType.METADATA_CHANGE
     
     return HistoryAction(
-        id=str(uuid.uuid4()),
+        id=_next_action_id(),
         timestamp=time.time(),
         action_type=action_type_enum,
         files=[filepath],
@@ -288,7 +318,7 @@ def create_delete_field_action(filepath: str, field: str, old_value: str) -> His
         description += f" (was \"{old_value}\")"
     
     return HistoryAction(
-        id=str(uuid.uuid4()),
+        id=_next_action_id(),
         timestamp=time.time(),
         action_type=ActionType.DELETE_FIELD,
         files=[filepath],
@@ -313,7 +343,7 @@ def create_batch_metadata_action(folder_path: str, field: str, value: str, file_
         new_values[filepath] = new_value
     
     return HistoryAction(
-        id=str(uuid.uuid4()),
+        id=_next_action_id(),
         timestamp=time.time(),
         action_type=ActionType.BATCH_METADATA,
         files=files,
@@ -338,7 +368,7 @@ def create_album_art_action(filepath: str, old_art: Optional[str], new_art: Opti
         action_type = ActionType.ALBUM_ART_CHANGE
     
     return HistoryAction(
-        id=str(uuid.uuid4()),
+        id=_next_action_id(),
         timestamp=time.time(),
         action_type=action_type,
         files=[filepath],
@@ -365,7 +395,7 @@ def create_batch_album_art_action(folder_path: str, art_data: str, file_changes:
         new_values[filepath] = new_art_path
     
     return HistoryAction(
-        id=str(uuid.uuid4()),
+        id=_next_action_id(),
         timestamp=time.time(),
         action_type=ActionType.BATCH_ALBUM_ART,
         files=files,
@@ -387,7 +417,7 @@ def create_field_creation_action(filepath: str, field_name: str, field_value: st
         description += f" with value \"{display_value}\""
     
     return HistoryAction(
-        id=str(uuid.uuid4()),
+        id=_next_action_id(),
         timestamp=time.time(),
         action_type=ActionType.CREATE_FIELD,
         files=[filepath],
@@ -402,7 +432,7 @@ def create_batch_field_creation_action(filepaths: List[str], field_name: str, fi
     description = f"Created field '{field_name}' in {len(filepaths)} files"
     
     return HistoryAction(
-        id=str(uuid.uuid4()),
+        id=_next_action_id(),
         timestamp=time.time(),
         action_type=ActionType.BATCH_CREATE_FIELD,
         files=filepaths,
@@ -426,7 +456,7 @@ def create_batch_delete_field_action(folder_path: str, field_id: str,
         old_values[filepath] = previous_value
     
     return HistoryAction(
-        id=str(uuid.uuid4()),
+        id=_next_action_id(),
         timestamp=time.time(),
         action_type=ActionType.BATCH_DELETE_FIELD,
         files=files,
@@ -17,24 +17,79 @@
 """
 Metadata inference engine for intelligent field suggestions
 """
+import os
 import re
 import time
 import hashlib
 import urllib.parse
-import urllib.request
-import urllib.error
+import http.client
 import json
 import threading
-from pathlib import Path
-from collections import defaultdict, Counter
+from collections import defaultdict, Counter, OrderedDict
 from datetime import datetime
 from typing import List, Dict, Optional
 
 from config import (
-    INFERENCE_CACHE_DURATION, MUSICBRAINZ_RATE_LIMIT,
+    INFERENCE_CACHE_DURATION, INFERENCE_RESULT_CACHE_SIZE, MUSICBRAINZ_RATE_LIMIT,
     MUSICBRAINZ_USER_AGENT, FIELD_THRESHOLDS, logger
 )
 
+MUSICBRAINZ_HOST = 'musicbrainz.org'
+MUSICBRAINZ_TIMEOUT = 10  # seconds
+
+# Patterns used on every inference call, compiled once at import
+_PAREN_RE = re.compile(r'\(([^)]+)\)')
+_BRACKET_RE = re.compile(r'\[([^\]]+)\]')
+_TRACK_NUMBER_RE = re.compile(r'^\d{1,3}$')
+_TRACK_PREFIX_RE = re.compile(r'^(\d{1,3})[\s\-_.]+')
+_TRACK_PREFIXED_NAME_RE = re.compile(r'^(\d{1,3})[\s\-_.]+(.+)')
+_YEAR_RE = re.compile(r'\b(19[5-9]\d|20[0-2]\d)\b')
+_FOUR_DIGITS_RE = re.compile(r'^\d{4}$')
+_PAREN_YEAR_RE = re.compile(r'\((\d{4})\)')
+_LEADING_YEAR_RE = re.compile(r'^(\d{4})')
+_CAPITALIZED_NAME_RE = re.compile(r'^[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*$')
+_COMPOSER_WORK_RE = re.compile(r'^([A-Z][a-zA-Z\s\.,]+)\s*[-_]\s*([^-_]+(?:\s*[Oo]p\.?\s*\d+[a-zA-Z]?))\s*[-_]\s*(.+)')
+_COMPOSER_PREFIX_RE = re.compile(r'^([A-Z][a-zA-Z\s\.,]+?)(?:\s*[-_]|\s+(?:Op|BWV|K|D|Hob|RV|S))')
+_DISAMBIGUATION_COMPOSER_RE = re.compile(r'by ([A-Z][a-zA-Z\s\.]+)')
+
+_TRACK_PATTERNS = [
+    (re.compile(r'^(\d{1,3})[\s\-_.]+', re.IGNORECASE), 95),  # "01 - ", "1. ", etc
+    (re.compile(r'^(\d{1,3})\s*$', re.IGNORECASE), 90),        # Just a number
+    (re.compile(r'^\[(\d{1,3})\]', re.IGNORECASE), 85),        # "[01]"
+    (re.compile(r'^track[\s_]*(\d{1,3})', re.IGNORECASE), 85), # "track01", "track_1"
+    (re.compile(r'[\s\-_](\d{1,3})[\s\-_]', re.IGNORECASE), 70), # Number in middle
+]
+
+_OPUS_PATTERNS = [
+    re.compile(r'Op\.?\s*\d+[a-zA-Z]?', re.IGNORECASE),
+    re.compile(r'BWV\s*\d+', re.IGNORECASE),  # Bach
+    re.compile(r'K\.?\s*\d+', re.IGNORECASE),  # Mozart/Scarlatti
+    re.compile(r'D\.?\s*\d+', re.IGNORECASE),  # Schubert
+    re.compile(r'Hob\.?\s*[IVX]+:\d+', re.IGNORECASE),  # Haydn
+    re.compile(r'RV\s*\d+', re.IGNORECASE),  # Vivaldi
+    re.compile(r'S\.?\s*\d+', re.IGNORECASE)  # Liszt
+]
+
+_DISC_PATTERNS = [
+    (re.compile(r'\bCD[\s]?(\d{1,2})\b', re.IGNORECASE), 90),
+    (re.compile(r'\bDisc[\s]?(\d{1,2})\b', re.IGNORECASE), 90),
+    (re.compile(r'\bDisk[\s]?(\d{1,2})\b', re.IGNORECASE), 90),
+    (re.compile(r'\bD(\d{1,2})\b', re.IGNORECASE), 70),
+    (re.compile(r'\[(\d{1,2})\]', re.IGNORECASE), 60),  # Might be disc in brackets
+]
+
+_TITLE_EXTENSION_RE = re.compile(r'\.(mp3|flac|m4a|wav|wma|wv)$', re.IGNORECASE)
+_TITLE_LEADING_NUMBERS_RE = re.compile(r'^[\d\s\-_.]+')
+_WHITESPACE_RE = re.compile(r'\s+')
+_QUALITY_PATTERNS = [
+    re.compile(r'\[?\d{3,4}kbps\]?', re.IGNORECASE),
+    re.compile(r'\[?320\]?', re.IGNORECASE),
+    re.compile(r'\[?FLAC\]?', re.IGNORECASE),
+    re.compile(r'\[?MP3\]?', re.IGNORECASE),
+    re.compile(r'\(Explicit\)', re.IGNORECASE),
+    re.compile(r'\[Explicit\]', re.IGNORECASE),
+]
+
 # =========================
 # METADATA INFERENCE ENGINE
 # =========================
@@ -45,8 +100,12 @@ class MetadataInferenceEngine:
     def __init__(self):
         self.cache = {}
         self.cache_lock = threading.Lock()
+        self.result_cache = OrderedDict()
         self.mb_last_request = 0
         self.mb_rate_limit = MUSICBRAINZ_RATE_LIMIT
+        self.mb_rate_lock = threading.Lock()
+        # Keep-alive connection per thread, reused across lookups to skip TCP/TLS setup
+        self.mb_local = threading.local()
         
         # Confidence thresholds
         self.field_thresholds = FIELD_THRESHOLDS
@@ -54,6 +113,17 @@ class MetadataInferenceEngine:
     def infer_field(self, file_path: str, field: str, existing_metadata: dict, folder_context: dict) -> List[dict]:
         """Main entry point for inferring a single field"""
         
+        # Identical inputs produce identical suggestions, so serve repeats from memory
+        cache_key = self._result_cache_key(file_path, field, existing_metadata, folder_context)
+        with self.cache_lock:
+            if cache_key in self.result_cache:
+                cached_results, cached_time = self.result_cache[cache_key]
+                if time.time() - cached_time < INFERENCE_CACHE_DURATION:
+                    self.result_cache.move_to_end(cache_key)
+                    return list(cached_results)
+                # MusicBrainz data behind the suggestions may have changed
+                del self.result_cache[cache_key]
+        
         # Build evidence state
         evidence_state = self._build_evidence_state(file_path, existing_metadata, folder_context)
         
@@ -73,29 +143,44 @@ class MetadataInferenceEngine:
         
         # Return top candidates with confidence >= threshold/2
         threshold = self.field_thresholds.get(field, 70) / 2
-        return [c for c in final_candidates if c['confidence'] >= threshold][:5]
+        results = [c for c in final_candidates if c['confidence'] >= threshold][:5]
+        
+        with self.cache_lock:
+            self.result_cache[cache_key] = (results, time.time())
+            if len(self.result_cache) > INFERENCE_RESULT_CACHE_SIZE:
+                self.result_cache.popitem(last=False)
+        
+        return list(results)
+    
+    def _result_cache_key(self, file_path: str, field: str, existing_metadata: dict, folder_context: dict) -> str:
+        """Fingerprint every input that inference depends on"""
+        sibling_names = sorted(s['name'] for s in folder_context.get('files', []))
+        payload = json.dumps([file_path, field, existing_metadata, sibling_names], sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
     
     def _build_evidence_state(self, file_path: str, existing_metadata: dict, folder_context: dict) -> dict:
         """Build comprehensive evidence state"""
-        path = Path(file_path)
+        folder_path, filename = os.path.split(file_path)
+        stem, extension = os.path.splitext(filename)
+        folder_name = os.path.basename(folder_path)
         
         # Extract filename features
-        filename_segments = self._extract_filename_segments(path.name)
+        filename_segments = self._extract_filename_segments(filename)
         
         # Analyze folder structure
-        folder_parts = path.parent.name.split('/')
+        folder_parts = folder_name.split('/')
         
         # Get sibling files
         siblings = folder_context.get('files', [])
-        sibling_patterns = self._analyze_sibling_patterns(siblings, path.name)
+        sibling_patterns = self._analyze_sibling_patterns(siblings, filename)
         
         return {
             'filepath': file_path,
-            'filename': path.name,
-            'filename_no_ext': path.stem,
-            'extension': path.suffix.lower(),
-            'folder_name': path.parent.name,
-            'parent_folder': path.parent.parent.name if path.parent.parent else None,
+            'filename': filename,
+            'filename_no_ext': stem,
+            'extension': extension.lower(),
+            'folder_name': folder_name,
+            'parent_folder': os.path.basename(os.path.dirname(folder_path)),
             'folder_parts': folder_parts,
             'existing_metadata': existing_metadata,
             'filename_segments': filename_segments,
@@ -108,7 +193,7 @@ class MetadataInferenceEngine:
         segments = []
         
         # Remove extension
-        name = Path(filename).stem
+        name = os.path.splitext(filename)[0]
         
         # Try different delimiters
         delimiters = [' - ', '-', '_', '~', ' · ', ' — ', '.', ' ']
@@ -123,8 +208,8 @@ class MetadataInferenceEngine:
                 })
         
         # Extract parenthetical info
-        paren_matches = re.findall(r'\(([^)]+)\)', name)
-        bracket_matches = re.findall(r'\[([^\]]+)\]', name)
+        paren_matches = _PAREN_RE.findall(name)
+        bracket_matches = _BRACKET_RE.findall(name)
         
         for match in paren_matches + bracket_matches:
             segments.append({
@@ -177,7 +262,6 @@ class MetadataInferenceEngine:
         # Find common prefixes/suffixes
         if filenames:
             # Common prefix
-            import os
             prefix = os.path.commonprefix(filenames)
             if len(prefix) > 3:
                 patterns['common_prefixes'][prefix] = len(filenames)
@@ -186,7 +270,7 @@ class MetadataInferenceEngine:
             track_matches = []
             for fn in filenames + [current_file]:
                 # Match various track patterns
-                match = re.match(r'^(\d{1,3})[\s\-_.]+(.+)', fn)
+                match = _TRACK_PREFIXED_NAME_RE.match(fn)
                 if match:
                     track_matches.append(match.group(1))
             
@@ -225,7 +309,7 @@ class MetadataInferenceEngine:
             # Common patterns
             if len(parts) == 2:
                 # Assume "Artist - Title" or "Track - Title"
-                if re.match(r'^\d{1,3}$', parts[0].strip()):
+                if _TRACK_NUMBER_RE.match(parts[0].strip()):
                     # First part is track number
                     candidates.append({
                         'value': parts[1].strip(),
@@ -244,7 +328,7 @@ class MetadataInferenceEngine:
             
             elif len(parts) >= 3:
                 # Try "Track - Artist - Title" or "Artist - Album - Title"
-                if re.match(r'^\d{1,3}$', parts[0].strip()):
+                if _TRACK_NUMBER_RE.match(parts[0].strip()):
                     candidates.append({
                         'value': parts[-1].strip(),
                         'confidence': 80,
@@ -264,7 +348,7 @@ class MetadataInferenceEngine:
         filename_clean = evidence_state['filename_no_ext']
         
         # Remove leading track numbers
-        track_removed = re.sub(r'^\d{1,3}[\s\-_.]+', '', filename_clean)
+        track_removed = _TRACK_PREFIX_RE.sub('', filename_clean)
         if track_removed != filename_clean:
             candidates.append({
                 'value': track_removed.strip(),
@@ -337,7 +421,7 @@ class MetadataInferenceEngine:
             if len(parts) >= 2:
                 # First part might be artist (unless it's a track number)
                 first_part = parts[0].strip()
-                if not re.match(r'^\d{1,3}$', first_part):
+                if not _TRACK_NUMBER_RE.match(first_part):
                     candidates.append({
                         'value': first_part,
                         'confidence': 70,
@@ -346,7 +430,7 @@ class MetadataInferenceEngine:
                     })
                 
                 # For 3+ parts, second might be artist
-                if len(parts) >= 3 and re.match(r'^\d{1,3}$', parts[0].strip()):
+                if len(parts) >= 3 and _TRACK_NUMBER_RE.match(parts[0].strip()):
                     candidates.append({
                         'value': parts[1].strip(),
                         'confidence': 75,
@@ -427,10 +511,10 @@ class MetadataInferenceEngine:
                 })
         
         # Strategy 3: Common album patterns in parentheses
-        paren_matches = re.findall(r'\(([^)]+)\)', evidence_state['filename'])
+        paren_matches = _PAREN_RE.findall(evidence_state['filename'])
         for match in paren_matches:
             # Check if it's a year
-            if not re.match(r'^\d{4}$', match):
+            if not _FOUR_DIGITS_RE.match(match):
                 candidates.append({
                     'value': match,
                     'confidence': 55,
@@ -447,29 +531,21 @@ class MetadataInferenceEngine:
         filename = evidence_state['filename_no_ext']
         
         # Strategy 1: Leading numbers
-        patterns = [
-            (r'^(\d{1,3})[\s\-_.]+', 95),  # "01 - ", "1. ", etc
-            (r'^(\d{1,3})\s*$', 90),        # Just a number
-            (r'^\[(\d{1,3})\]', 85),        # "[01]"
-            (r'^track[\s_]*(\d{1,3})', 85), # "track01", "track_1"
-            (r'[\s\-_](\d{1,3})[\s\-_]', 70), # Number in middle
-        ]
-        
-        for pattern, confidence in patterns:
-            match = re.search(pattern, filename, re.IGNORECASE)
+        for pattern, confidence in _TRACK_PATTERNS:
+            match = pattern.search(filename)
             if match:
                 track_num = match.group(1).lstrip('0') or '0'
                 candidates.append({
                     'value': track_num,
                     'confidence': confidence,
                     'source': 'filename_pattern',
-                    'evidence': [f'pattern:{pattern}']
+                    'evidence': [f'pattern:{pattern.pattern}']
                 })
         
         # Strategy 2: From sibling patterns
         if evidence_state['sibling_patterns'].get('track_pattern') == 'prefix_number':
             # Try to extract from current filename using same pattern
-            match = re.match(r'^(\d{1,3})[\s\-_.]+', filename)
+            match = _TRACK_PREFIX_RE.match(filename)
             if match:
                 candidates.append({
                     'value': match.group(1).lstrip('0') or '0',
@@ -491,11 +567,8 @@ class MetadataInferenceEngine:
         """Infer date/year from evidence"""
         candidates = []
         
-        # Look for 4-digit years
-        year_pattern = r'\b(19[5-9]\d|20[0-2]\d)\b'
-        
         # Strategy 1: From filename
-        filename_years = re.findall(year_pattern, evidence_state['filename'])
+        filename_years = _YEAR_RE.findall(evidence_state['filename'])
         for year in filename_years:
             candidates.append({
                 'value': year,
@@ -505,7 +578,7 @@ class MetadataInferenceEngine:
             })
         
         # Strategy 2: From folder name
-        folder_years = re.findall(year_pattern, evidence_state['folder_name'])
+        folder_years = _YEAR_RE.findall(evidence_state['folder_name'])
         for year in folder_years:
             candidates.append({
                 'value': year,
@@ -515,9 +588,9 @@ class MetadataInferenceEngine:
             })
         
         # Strategy 3: From parentheses (often contains year)
-        paren_matches = re.findall(r'\((\d{4})\)', evidence_state['filename'] + ' ' + evidence_state['folder_name'])
+        paren_matches = _PAREN_YEAR_RE.findall(evidence_state['filename'] + ' ' + evidence_state['folder_name'])
         for year in paren_matches:
-            if re.match(year_pattern, year):
+            if _YEAR_RE.match(year):
                 candidates.append({
                     'value': year,
                     'confidence': 85,
@@ -574,8 +647,7 @@ class MetadataInferenceEngine:
         filename = evidence_state['filename_no_ext']
         
         # Pattern: Composer - Work - Movement
-        composer_work_pattern = r'^([A-Z][a-zA-Z\s\.,]+)\s*[-_]\s*([^-_]+(?:\s*[Oo]p\.?\s*\d+[a-zA-Z]?))\s*[-_]\s*(.+)'
-        match = re.match(composer_work_pattern, filename)
+        match = _COMPOSER_WORK_RE.match(filename)
         if match:
             composer_name = match.group(1).strip()
             candidates.append({
@@ -586,20 +658,10 @@ class MetadataInferenceEngine:
             })
         
         # Pattern: Look for opus numbers which indicate classical music
-        opus_patterns = [
-            r'Op\.?\s*\d+[a-zA-Z]?',
-            r'BWV\s*\d+',  # Bach
-            r'K\.?\s*\d+',  # Mozart/Scarlatti
-            r'D\.?\s*\d+',  # Schubert
-            r'Hob\.?\s*[IVX]+:\d+',  # Haydn
-            r'RV\s*\d+',  # Vivaldi
-            r'S\.?\s*\d+'  # Liszt
-        ]
-        
-        for pattern in opus_patterns:
-            if re.search(pattern, filename, re.IGNORECASE):
+        for pattern in _OPUS_PATTERNS:
+            if pattern.search(filename):
                 # Extract potential composer from beginning of filename
-                composer_match = re.match(r'^([A-Z][a-zA-Z\s\.,]+?)(?:\s*[-_]|\s+(?:Op|BWV|K|D|Hob|RV|S))', filename)
+                composer_match = _COMPOSER_PREFIX_RE.match(filename)
                 if composer_match:
                     candidates.append({
                         'value': composer_match.group(1).strip(),
@@ -640,10 +702,10 @@ class MetadataInferenceEngine:
                         })
         
         # Strategy 3: Extract from parentheses (often contains composer)
-        paren_matches = re.findall(r'\(([^)]+)\)', evidence_state['filename'])
+        paren_matches = _PAREN_RE.findall(evidence_state['filename'])
         for match in paren_matches:
             # Check if it looks like a name (capitalized words)
-            if re.match(r'^[A-Z][a-zA-Z]+(?:\s+[A-Z][a-zA-Z]+)*$', match.strip()):
+            if _CAPITALIZED_NAME_RE.match(match.strip()):
                 candidates.append({
                     'value': match.strip(),
                     'confidence': 65,
@@ -679,26 +741,17 @@ class MetadataInferenceEngine:
         filename = evidence_state['filename_no_ext']
         folder = evidence_state['folder_name']
         
-        # Patterns to check
-        patterns = [
-            (r'\bCD[\s]?(\d{1,2})\b', 90),
-            (r'\bDisc[\s]?(\d{1,2})\b', 90),
-            (r'\bDisk[\s]?(\d{1,2})\b', 90),
-            (r'\bD(\d{1,2})\b', 70),
-            (r'\[(\d{1,2})\]', 60),  # Might be disc in brackets
-        ]
-        
         # Check filename and folder
         for text in [filename, folder]:
-            for pattern, confidence in patterns:
-                match = re.search(pattern, text, re.IGNORECASE)
+            for pattern, confidence in _DISC_PATTERNS:
+                match = pattern.search(text)
                 if match:
                     disc_num = match.group(1).lstrip('0') or '0'
                     candidates.append({
                         'value': disc_num,
                         'confidence': confidence,
                         'source': 'filename' if text == filename else 'folder',
-                        'evidence': [f'pattern:{pattern}']
+                        'evidence': [f'pattern:{pattern.pattern}']
                     })
         
         return self._deduplicate_candidates(candidates, 'disc')
@@ -706,22 +759,14 @@ class MetadataInferenceEngine:
     def _clean_title(self, title: str) -> str:
         """Clean up a title string"""
         # Remove common artifacts
-        title = re.sub(r'\.(mp3|flac|m4a|wav|wma|wv)$', '', title, flags=re.IGNORECASE)
-        title = re.sub(r'^[\d\s\-_.]+', '', title)  # Remove leading track numbers
-        title = re.sub(r'\s+', ' ', title)  # Normalize whitespace
+        title = _TITLE_EXTENSION_RE.sub('', title)
+        title = _TITLE_LEADING_NUMBERS_RE.sub('', title)  # Remove leading track numbers
+        title = _WHITESPACE_RE.sub(' ', title)  # Normalize whitespace
         title = title.strip(' -_.')
         
         # Remove quality indicators
-        quality_patterns = [
-            r'\[?\d{3,4}kbps\]?',
-            r'\[?320\]?',
-            r'\[?FLAC\]?',
-            r'\[?MP3\]?',
-            r'\(Explicit\)',
-            r'\[Explicit\]',
-        ]
-        for pattern in quality_patterns:
-            title = re.sub(pattern, '', title, flags=re.IGNORECASE)
+        for pattern in _QUALITY_PATTERNS:
+            title = pattern.sub('', title)
         
         return title.strip()
     
@@ -784,13 +829,6 @@ class MetadataInferenceEngine:
     def _query_musicbrainz(self, evidence_state: dict, field: str, local_candidates: List[dict]) -> List[dict]:
         """Query MusicBrainz API strategically"""
         
-        # Rate limiting
-        with self.cache_lock:
-            time_since_last = time.time() - self.mb_last_request
-            if time_since_last < self.mb_rate_limit:
-                time.sleep(self.mb_rate_limit - time_since_last)
-            self.mb_last_request = time.time()
-        
         candidates = []
         
         try:
@@ -866,7 +904,7 @@ class MetadataInferenceEngine:
 
     def _mb_search_work(self, work_title: str) -> dict:
         """Search MusicBrainz for classical works"""
-        cache_key = hashlib.md5(f"work:{work_title}".encode()).hexdigest()
+        cache_key = hashlib.blake2b(f"work:{work_title}".encode(), digest_size=16).hexdigest()
         
         with self.cache_lock:
             if cache_key in self.cache:
@@ -875,20 +913,15 @@ class MetadataInferenceEngine:
                     return cached_data
         
         query = f'work:"{work_title}"'
-        url = f"https://musicbrainz.org/ws/2/work/?query={urllib.parse.quote(query)}&fmt=json&limit=5"
+        path = f"/ws/2/work/?query={urllib.parse.quote(query)}&fmt=json&limit=5"
         
         try:
-            req = urllib.request.Request(url, headers={
-                'User-Agent': MUSICBRAINZ_USER_AGENT
-            })
+            data = self._mb_get(path)
             
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                
-                with self.cache_lock:
-                    self.cache[cache_key] = (data, time.time())
+            with self.cache_lock:
+                self.cache[cache_key] = (data, time.time())
                 
-                return data
+            return data
         except Exception as e:
             logger.error(f"MusicBrainz API error: {e}")
             return {'works': []}
@@ -918,7 +951,7 @@ class MetadataInferenceEngine:
                 # Sometimes composer is in disambiguation
                 disambig = work['disambiguation']
                 # Simple pattern to extract composer names
-                composer_match = re.search(r'by ([A-Z][a-zA-Z\s\.]+)', disambig)
+                composer_match = _DISAMBIGUATION_COMPOSER_RE.search(disambig)
                 if composer_match:
                     candidates.append({
                         'value': composer_match.group(1).strip(),
@@ -931,7 +964,7 @@ class MetadataInferenceEngine:
     
     def _mb_search_recordings(self, artist: str, title: str) -> dict:
         """Search MusicBrainz for recordings"""
-        cache_key = hashlib.md5(f"rec:{artist}:{title}".encode()).hexdigest()
+        cache_key = hashlib.blake2b(f"rec:{artist}:{title}".encode(), digest_size=16).hexdigest()
         
         # Check cache
         with self.cache_lock:
@@ -942,28 +975,23 @@ class MetadataInferenceEngine:
         
         # Build query
         query = f'artist:"{artist}" AND recording:"{title}"'
-        url = f"https://musicbrainz.org/ws/2/recording/?query={urllib.parse.quote(query)}&fmt=json&limit=5"
+        path = f"/ws/2/recording/?query={urllib.parse.quote(query)}&fmt=json&limit=5"
         
         try:
-            req = urllib.request.Request(url, headers={
-                'User-Agent': MUSICBRAINZ_USER_AGENT
-            })
+            data = self._mb_get(path)
             
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
+            # Cache result
+            with self.cache_lock:
+                self.cache[cache_key] = (data, time.time())
                 
-                # Cache result
-                with self.cache_lock:
-                    self.cache[cache_key] = (data, time.time())
-                
-                return data
+            return data
         except Exception as e:
             logger.error(f"MusicBrainz API error: {e}")
             return {'recordings': []}
     
     def _mb_search_artist(self, artist: str) -> dict:
         """Search MusicBrainz for artist"""
-        cache_key = hashlib.md5(f"artist:{artist}".encode()).hexdigest()
+        cache_key = hashlib.blake2b(f"artist:{artist}".encode(), digest_size=16).hexdigest()
         
         with self.cache_lock:
             if cache_key in self.cache:
@@ -972,27 +1000,22 @@ class MetadataInferenceEngine:
                     return cached_data
         
         query = f'artist:"{artist}"'
-        url = f"https://musicbrainz.org/ws/2/artist/?query={urllib.parse.quote(query)}&fmt=json&limit=3"
+        path = f"/ws/2/artist/?query={urllib.parse.quote(query)}&fmt=json&limit=3"
         
         try:
-            req = urllib.request.Request(url, headers={
-                'User-Agent': MUSICBRAINZ_USER_AGENT
-            })
+            data = self._mb_get(path)
             
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                
-                with self.cache_lock:
-                    self.cache[cache_key] = (data, time.time())
+            with self.cache_lock:
+                self.cache[cache_key] = (data, time.time())
                 
-                return data
+            return data
         except Exception as e:
             logger.error(f"MusicBrainz API error: {e}")
             return {'artists': []}
     
     def _mb_search_release(self, artist: str, album: str) -> dict:
         """Search MusicBrainz for release"""
-        cache_key = hashlib.md5(f"release:{artist}:{album}".encode()).hexdigest()
+        cache_key = hashlib.blake2b(f"release:{artist}:{album}".encode(), digest_size=16).hexdigest()
         
         with self.cache_lock:
             if cache_key in self.cache:
@@ -1001,24 +1024,61 @@ class MetadataInferenceEngine:
                     return cached_data
         
         query = f'artist:"{artist}" AND release:"{album}"'
-        url = f"https://musicbrainz.org/ws/2/release/?query={urllib.parse.quote(query)}&fmt=json&limit=5"
+        path = f"/ws/2/release/?query={urllib.parse.quote(query)}&fmt=json&limit=5"
         
         try:
-            req = urllib.request.Request(url, headers={
-                'User-Agent': MUSICBRAINZ_USER_AGENT
-            })
+            data = self._mb_get(path)
             
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
-                
-                with self.cache_lock:
-                    self.cache[cache_key] = (data, time.time())
+            with self.cache_lock:
+                self.cache[cache_key] = (data, time.time())
                 
-                return data
+            return data
         except Exception as e:
             logger.error(f"MusicBrainz API error: {e}")
             return {'releases': []}
     
+    def _mb_get(self, path: str) -> dict:
+        """GET a MusicBrainz API path over this thread's persistent connection"""
+        # Rate limiting applies to actual network requests only, not cache hits
+        with self.mb_rate_lock:
+            time_since_last = time.monotonic() - self.mb_last_request
+            if time_since_last < self.mb_rate_limit:
+                time.sleep(self.mb_rate_limit - time_since_last)
+            self.mb_last_request = time.monotonic()
+        
+        headers = {
+            'User-Agent': MUSICBRAINZ_USER_AGENT,
+            'Accept': 'application/json'
+        }
+        
+        while True:
+            connection = getattr(self.mb_local, 'connection', None)
+            reused = connection is not None
+            if not reused:
+                connection = http.client.HTTPSConnection(MUSICBRAINZ_HOST, timeout=MUSICBRAINZ_TIMEOUT)
+                self.mb_local.connection = connection
+            
+            try:
+                connection.request('GET', path, headers=headers)
+                response = connection.getresponse()
+                body = response.read()
+            except (http.client.HTTPException, OSError):
+                connection.close()
+                self.mb_local.connection = None
+                # The server may have dropped an idle keep-alive connection; retry once on a fresh one
+                if reused:
+                    continue
+                raise
+            
+            if response.will_close:
+                connection.close()
+                self.mb_local.connection = None
+            
+            if response.status != 200:
+                raise http.client.HTTPException(f"HTTP {response.status} {response.reason}")
+            
+            return json.loads(body.decode('utf-8'))
+    
     def _extract_mb_candidates(self, mb_data: dict, field: str) -> List[dict]:
         """Extract candidates from MusicBrainz recording search"""
         candidates = []
@@ -1091,7 +1151,7 @@ class MetadataInferenceEngine:
             date_str = release.get('date', '')
             if date_str:
                 # Extract year
-                year_match = re.match(r'^(\d{4})', date_str)
+                year_match = _LEADING_YEAR_RE.match(date_str)
                 if year_match:
                     candidates.append({
                         'value': year_match.group(1),
@@ -1146,6 +1206,12 @@ class MetadataInferenceEngine:
     
     def _calculate_final_scores(self, candidates: List[dict], evidence_state: dict, field: str) -> List[dict]:
         """Calculate final confidence scores with context awareness"""
+        # Lowercase the evidence once rather than for every candidate
+        filename_lower = evidence_state['filename'].lower()
+        folder_lower = evidence_state['folder_name'].lower()
+        parent_lower = evidence_state['parent_folder'].lower() if evidence_state['parent_folder'] else ''
+        albumartist = evidence_state['existing_metadata'].get('albumartist')
+        albumartist_lower = albumartist.lower() if albumartist else None
         
         for candidate in candidates:
             # Apply contextual adjustments
@@ -1155,19 +1221,19 @@ class MetadataInferenceEngine:
             value_lower = candidate['value'].lower()
             appearances = 0
             
-            if value_lower in evidence_state['filename'].lower():
+            if value_lower in filename_lower:
                 appearances += 1
-            if value_lower in evidence_state['folder_name'].lower():
+            if value_lower in folder_lower:
                 appearances += 1
-            if evidence_state['parent_folder'] and value_lower in evidence_state['parent_folder'].lower():
+            if parent_lower and value_lower in parent_lower:
                 appearances += 1
             
             if appearances > 1:
                 confidence = min(confidence + (appearances * 5), 100)
             
             # Field-specific adjustments
-            if field == 'artist' and evidence_state['existing_metadata'].get('albumartist'):
-                if value_lower == evidence_state['existing_metadata']['albumartist'].lower():
+            if field == 'artist' and albumartist_lower:
+                if value_lower == albumartist_lower:
                     confidence = min(confidence + 10, 100)
             
             candidate['confidence'] = round(confidence)
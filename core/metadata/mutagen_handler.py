@@ -22,10 +22,11 @@ This module uses Mutagen (https://github.com/quodlibet/mutagen)
 Licensed under LGPL-2.1+ for audio metadata operations.
 """
 
+import io
 import os
 import base64
 import logging
-from typing import Dict, Any, Optional, Union, Tuple
+from typing import Dict, Any, Optional, Union, Tuple, Callable
 import unicodedata
 
 from mutagen import File
@@ -385,6 +386,13 @@ class MutagenHandler:
         # Build reverse mappings
         self._build_id3_mappings()
     
+    def warmup(self):
+        """Import the format modules mutagen.File probes lazily, so the first real read doesn't pay for them"""
+        try:
+            File(io.BytesIO(b'\0' * 128))
+        except Exception as e:
+            logger.debug(f"Mutagen warmup failed: {e}")
+    
     def _is_valid_field(self, field_id: str, field_value: Any) -> bool:
         """Check if field should be sent to frontend"""
         
@@ -530,30 +538,30 @@ class MutagenHandler:
             if audio_file is None:
                 raise Exception("Unsupported file format")
             
-            # Determine format type
-            format_map = {
-                MP3: 'mp3',
-                OggVorbis: 'ogg',
-                OggOpus: 'ogg',  # We use 'ogg' for both Vorbis and Opus
-                FLAC: 'flac',
-                MP4: 'mp4',
-                ASF: 'asf',
-                WavPack: 'wavpack',
-                WAVE: 'wav'
-            }
-            
-            format_type = 'unknown'
-            for file_type, format_name in format_map.items():
-                if isinstance(audio_file, file_type):
-                    format_type = format_name
-                    break
-            
-            return audio_file, format_type
+            return audio_file, self._format_type(audio_file)
             
         except Exception as e:
             logger.error(f"Error detecting format for {filepath}: {e}")
             return None, 'unknown'
     
+    def _format_type(self, audio_file) -> str:
+        """Map a Mutagen File object to our format string"""
+        format_map = {
+            MP3: 'mp3',
+            OggVorbis: 'ogg',
+            OggOpus: 'ogg',  # We use 'ogg' for both Vorbis and Opus
+            FLAC: 'flac',
+            MP4: 'mp4',
+            ASF: 'asf',
+            WavPack: 'wavpack',
+            WAVE: 'wav'
+        }
+        
+        for file_type, format_name in format_map.items():
+            if isinstance(audio_file, file_type):
+                return format_name
+        return 'unknown'
+    
     def read_metadata(self, filepath: str) -> Dict[str, Any]:
         """
         Read metadata from audio file using Mutagen
@@ -663,6 +671,10 @@ class MutagenHandler:
         if audio_file is None:
             raise Exception("Could not read file with Mutagen")
         
+        return self._read_existing_from(audio_file, format_type)
+    
+    def _read_existing_from(self, audio_file, format_type: str) -> Dict[str, Any]:
+        """Collect existing metadata fields from an already opened Mutagen file"""
         metadata = {
             'format': format_type  # Include format information
         }
@@ -760,6 +772,47 @@ class MutagenHandler:
         """Convert single space to empty string for UI display"""
         return '' if value == ' ' else value
     
+    def field_holds_value(self, filepath: str, field: str, value: str) -> bool:
+        """
+        Check whether writing a standard field would leave its stored tag unchanged
+        
+        Compares every value of the raw tag write_metadata overwrites, without the
+        display normalization of read_existing_metadata (first value only, ' ' as
+        empty, MP4 track/disc numbers without totals).
+        
+        Args:
+            filepath: Path to audio file
+            field: Standard field name (e.g. 'title')
+            value: Value that would be written
+            
+        Returns:
+            bool: True only if the tag already holds exactly what would be written;
+                  False when unsure (other formats, MP4 track/disc)
+        """
+        audio_file, format_type = self.detect_format(filepath)
+        if audio_file is None or audio_file.tags is None:
+            return False
+        
+        tag_name = self.tag_mappings.get(format_type, {}).get(field)
+        if not tag_name:
+            return False
+        
+        # Same conversions write_metadata applies before storing the value
+        if field == 'composer' and value:
+            value = self.normalize_composer_text(value)
+        if not value:
+            value = ' '
+        
+        if isinstance(audio_file, (MP3, WAVE)):
+            frame = audio_file.tags.get(tag_name)
+            return frame is not None and [str(text) for text in frame.text] == [value]
+        if isinstance(audio_file, (OggVorbis, OggOpus, FLAC)):
+            # Vorbis keys match case-insensitively, so this collects every variant
+            return audio_file.tags.get(tag_name) == [value]
+        if isinstance(audio_file, MP4) and field not in ['track', 'disc']:
+            return audio_file.tags.get(tag_name) == [value]
+        return False
+    
     def write_metadata(self, filepath: str, metadata: Dict[str, str], 
                       preserve_other_tags: bool = True) -> bool:
         """
@@ -1267,16 +1320,14 @@ class MutagenHandler:
         
         # Check if format supports album art
         base_format = os.path.splitext(filepath)[1].lstrip('.')
-        if base_format in FORMAT_METADATA_CONFIG.get('no_embedded_art', []):
+        if base_format in FORMAT_METADATA_CONFIG.get('no_embedded_art', ()):
             logger.warning(f"Format {base_format} does not support embedded album art")
             return
         
-        # Decode the image data
-        if ',' in art_data:
-            # Remove data URI prefix
-            image_data = base64.b64decode(art_data.split(',')[1])
-        else:
-            image_data = base64.b64decode(art_data)
+        # Decode the image data, removing any data URI prefix. partition stops at the
+        # first comma instead of scanning the whole multi-MB payload like split does
+        prefix, separator, payload = art_data.partition(',')
+        image_data = base64.b64decode(payload if separator else prefix)
         
         # Detect MIME type if not provided
         if not mime_type:
@@ -1489,29 +1540,64 @@ class MutagenHandler:
         - is_editable: Whether the field can be edited
         - field_type: 'text', 'binary', 'oversized'
         """
+        audio_file, _ = self.detect_format(filepath)
+        if audio_file is None:
+            logger.error(f"Could not read file: {filepath}")
+            return {}
+        
+        return self._discover_from(audio_file, filepath)
+    
+    def open_file(self, filepath: str) -> File:
+        """
+        Parse an audio file once so it can be read and then written without re-parsing
+        
+        Returns:
+            Mutagen File object, for read_and_discover and write_custom_field
+        """
+        audio_file, _ = self.detect_format(filepath)
+        if audio_file is None:
+            raise Exception("Could not read file with Mutagen")
+        return audio_file
+    
+    def read_and_discover(self, filepath: str, audio_file=None,
+                          key_filter: Optional[Callable[[str], bool]] = None) -> Tuple[Dict[str, Any], Dict[str, Dict[str, Any]]]:
+        """
+        Read existing metadata and discover all fields from a single parse of the file
+        
+        Args:
+            filepath: Path to the audio file
+            audio_file: Mutagen File object from open_file (optional, parsed here if omitted)
+            key_filter: Only discover tag keys it accepts, e.g. when probing for one field (optional)
+        
+        Returns:
+            Tuple of (read_existing_metadata result, discover_all_metadata result)
+        """
+        if audio_file is None:
+            audio_file = self.open_file(filepath)
+        format_type = self._format_type(audio_file)
+        
+        return self._read_existing_from(audio_file, format_type), self._discover_from(audio_file, filepath, key_filter)
+    
+    def _discover_from(self, audio_file, filepath: str, key_filter=None) -> Dict[str, Dict[str, Any]]:
+        """Discover all metadata fields of an already opened Mutagen file"""
         try:
-            audio_file, format_type = self.detect_format(filepath)
-            if audio_file is None:
-                logger.error(f"Could not read file: {filepath}")
-                return {}
-            
             discovered_fields = {}
             
             # Handle different format types
             if isinstance(audio_file, MP3):
                 if hasattr(audio_file, 'tags') and audio_file.tags:
-                    discovered_fields = self._discover_id3_fields(audio_file.tags)
+                    discovered_fields = self._discover_id3_fields(audio_file.tags, key_filter)
             elif isinstance(audio_file, (FLAC, OggVorbis, OggOpus)):
-                discovered_fields = self._discover_vorbis_fields(audio_file)
+                discovered_fields = self._discover_vorbis_fields(audio_file, key_filter)
             elif isinstance(audio_file, MP4):
-                discovered_fields = self._discover_mp4_fields(audio_file)
+                discovered_fields = self._discover_mp4_fields(audio_file, key_filter)
             elif isinstance(audio_file, ASF):
-                discovered_fields = self._discover_asf_fields(audio_file)
+                discovered_fields = self._discover_asf_fields(audio_file, key_filter)
             elif isinstance(audio_file, WavPack):
-                discovered_fields = self._discover_apev2_fields(audio_file)
+                discovered_fields = self._discover_apev2_fields(audio_file, key_filter)
             elif isinstance(audio_file, WAVE):
                 if hasattr(audio_file, 'tags') and audio_file.tags:
-                    discovered_fields = self._discover_id3_fields(audio_file.tags)
+                    discovered_fields = self._discover_id3_fields(audio_file.tags, key_filter)
             
             return discovered_fields
             
@@ -1519,7 +1605,7 @@ class MutagenHandler:
             logger.error(f"Error discovering metadata for {filepath}: {e}")
             return {}
     
-    def _discover_id3_fields(self, tags) -> Dict[str, Dict[str, Any]]:
+    def _discover_id3_fields(self, tags, key_filter=None) -> Dict[str, Dict[str, Any]]:
         """Discover all ID3 frames"""
         fields = {}
         
@@ -1534,6 +1620,10 @@ class MutagenHandler:
             if frame_id in standard_frame_ids:
                 continue
             
+            # Skip fields the caller isn't looking for
+            if key_filter and not key_filter(frame_id):
+                continue
+            
             # Skip APIC frames (album art) since they're handled separately
             if frame_id.startswith('APIC'):
                 continue
@@ -1571,7 +1661,7 @@ class MutagenHandler:
         
         return fields
     
-    def _discover_vorbis_fields(self, audio_file) -> Dict[str, Dict[str, Any]]:
+    def _discover_vorbis_fields(self, audio_file, key_filter=None) -> Dict[str, Dict[str, Any]]:
         """Discover all Vorbis comment fields"""
         fields = {}
         
@@ -1589,6 +1679,10 @@ class MutagenHandler:
             if field_name in standard_field_names:
                 continue
             
+            # Skip fields the caller isn't looking for
+            if key_filter and not key_filter(field_name):
+                continue
+            
             # Skip album art field
             if field_name == 'METADATA_BLOCK_PICTURE':
                 continue
@@ -1620,7 +1714,7 @@ class MutagenHandler:
         
         return fields
     
-    def _discover_mp4_fields(self, audio_file) -> Dict[str, Dict[str, Any]]:
+    def _discover_mp4_fields(self, audio_file, key_filter=None) -> Dict[str, Dict[str, Any]]:
         """Discover all MP4 atom fields"""
         fields = {}
         
@@ -1632,6 +1726,10 @@ class MutagenHandler:
             if atom in standard_atoms:
                 continue
             
+            # Skip fields the caller isn't looking for
+            if key_filter and not key_filter(atom):
+                continue
+            
             # Skip album art atom
             if atom == 'covr':
                 continue
@@ -1671,7 +1769,7 @@ class MutagenHandler:
         
         return fields
     
-    def _discover_asf_fields(self, audio_file) -> Dict[str, Dict[str, Any]]:
+    def _discover_asf_fields(self, audio_file, key_filter=None) -> Dict[str, Dict[str, Any]]:
         """Discover all ASF/WMA fields"""
         fields = {}
         
@@ -1686,6 +1784,10 @@ class MutagenHandler:
             if field_name in standard_field_names:
                 continue
             
+            # Skip fields the caller isn't looking for
+            if key_filter and not key_filter(field_name):
+                continue
+            
             # Skip album art fields
             if 'Picture' in field_name:
                 continue
@@ -1713,7 +1815,7 @@ class MutagenHandler:
         
         return fields
     
-    def _discover_apev2_fields(self, audio_file) -> Dict[str, Dict[str, Any]]:
+    def _discover_apev2_fields(self, audio_file, key_filter=None) -> Dict[str, Dict[str, Any]]:
         """Discover all APEv2 fields"""
         fields = {}
         
@@ -1727,6 +1829,10 @@ class MutagenHandler:
             # Skip standard fields to avoid duplicates
             if field_name in standard_field_names:
                 continue
+            
+            # Skip fields the caller isn't looking for
+            if key_filter and not key_filter(field_name):
+                continue
                 
             field_info = {
                 'field_name': field_name,
@@ -1848,7 +1954,7 @@ class MutagenHandler:
         
         return mp4_display_names.get(atom, atom)
     
-    def write_custom_field(self, filepath: str, field_name: str, field_value: str) -> bool:
+    def write_custom_field(self, filepath: str, field_name: str, field_value: str, audio_file=None) -> bool:
         """
         Write a custom field to an audio file using appropriate format-specific method.
         
@@ -1856,14 +1962,16 @@ class MutagenHandler:
             filepath: Path to the audio file
             field_name: Name of the custom field
             field_value: Value to write
+            audio_file: Mutagen File object from open_file, saved in place (optional)
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            audio_file, format_type = self.detect_format(filepath)
             if audio_file is None:
-                raise ValueError("Unsupported file format")
+                audio_file, _ = self.detect_format(filepath)
+                if audio_file is None:
+                    raise ValueError("Unsupported file format")
             
             # Determine format and use appropriate method
             if isinstance(audio_file, MP3):
@@ -2054,22 +2162,26 @@ class MutagenHandler:
             logger.error(f"Error writing custom APEv2 field: {e}")
             return False
     
-    def delete_field(self, filepath: str, field_id: str) -> bool:
+    def delete_field(self, filepath: str, field_id: str, audio_file=None) -> bool:
         """
         Delete a metadata field from an audio file with format-aware field name handling
         
         Args:
             filepath: Path to audio file
             field_id: Field ID to delete (e.g., 'title', 'TXXX:RATING', etc.)
+            audio_file: Mutagen File object from open_file, saved in place (optional)
         
         Returns:
             bool: True if successful
         """
         try:
-            audio_file, format_type = self.detect_format(filepath)
             if audio_file is None:
-                logger.error("Could not open file with Mutagen")
-                return False
+                audio_file, format_type = self.detect_format(filepath)
+                if audio_file is None:
+                    logger.error("Could not open file with Mutagen")
+                    return False
+            else:
+                format_type = self._format_type(audio_file)
             
             # Extract semantic name from field_id
             source_format = self._guess_source_format(field_id)
@@ -23,7 +23,7 @@ from config import FORMAT_METADATA_CONFIG
 def normalize_metadata_tags(tags, format_type=''):
     """Normalize common tag names from various formats"""
     # Handle iTunes/MP4 specific tags
-    if format_type in FORMAT_METADATA_CONFIG.get('itunes', []):
+    if format_type in FORMAT_METADATA_CONFIG.get('itunes', ()):
         return {
             'title': tags.get('title', tags.get('TITLE', tags.get('©nam', ''))),
             'artist': tags.get('artist', tags.get('ARTIST', tags.get('©ART', ''))),
@@ -78,7 +78,7 @@ def normalize_metadata_tags(tags, format_type=''):
 def get_metadata_field_mapping(use_uppercase, format_type=''):
     """Get proper metadata field names based on format"""
     # Special handling for iTunes/MP4 formats
-    if format_type in FORMAT_METADATA_CONFIG.get('itunes', []):
+    if format_type in FORMAT_METADATA_CONFIG.get('itunes', ()):
         return {
             'title': 'title',
             'artist': 'artist',
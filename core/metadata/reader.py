@@ -77,6 +77,6 @@ def get_format_limitations(base_format):
         dict: Dictionary with format limitation flags
     """
     return {
-        'supportsAlbumArt': base_format not in FORMAT_METADATA_CONFIG.get('no_embedded_art', []),
-        'hasLimitedMetadata': base_format in FORMAT_METADATA_CONFIG.get('limited', [])
+        'supportsAlbumArt': base_format not in FORMAT_METADATA_CONFIG.get('no_embedded_art', ()),
+        'hasLimitedMetadata': base_format in FORMAT_METADATA_CONFIG.get('limited', ())
     }
\ No newline at end of file
@@ -39,7 +39,8 @@ def apply_metadata_to_file(filepath, new_tags, art_data=None, remove_art=False):
     Raises:
         Exception: For any errors during metadata writing
     """
-    # Import from the processor module
+    # Import from the processor module here: it pulls in Pillow, which is only
+    # loaded once a request needs it
     from core.album_art.processor import detect_corrupted_album_art, fix_corrupted_album_art
     
     # Get file format
@@ -52,7 +53,7 @@ def apply_metadata_to_file(filepath, new_tags, art_data=None, remove_art=False):
             fix_corrupted_album_art(filepath)
     
     # Check if format supports embedded album art
-    if art_data and base_format in FORMAT_METADATA_CONFIG.get('no_embedded_art', []):
+    if art_data and base_format in FORMAT_METADATA_CONFIG.get('no_embedded_art', ()):
         logger.warning(f"Format {base_format} does not support embedded album art")
         art_data = None
     
@@ -0,0 +1,229 @@
+# Metadata Remote - Intelligent audio metadata editor
+# Copyright (C) 2025 Dr. William Nelson Leonard
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+
+"""
+WavPack transcoding for Metadata Remote
+Decodes WavPack files to WAV for browser playback and caches the results on disk
+"""
+import os
+import hashlib
+import subprocess
+import tempfile
+import threading
+import time
+
+from config import WAV_CACHE_DIR, WAV_CACHE_MAX_BYTES, WAV_DECODE_TIMEOUT, logger
+
+# How long a reader that caught up with a running decode waits before checking again
+FOLLOW_POLL_INTERVAL = 0.05
+
+class WavDecode:
+    """A wvunpack decode into the cache that any number of requests can stream from"""
+    
+    def __init__(self, tmp_path, cache_path):
+        self.tmp_path = tmp_path
+        self.cache_path = cache_path
+        self.done = threading.Event()
+        self.error = None
+
+# Decodes in progress by cache path, so concurrent requests for one file share a decode
+_decodes = {}
+_decodes_lock = threading.Lock()
+
+def wav_cache_path(file_path, st):
+    """
+    Get the cache location of a WavPack file's decoded WAV
+    
+    Args:
+        file_path: Absolute path to the .wv file
+        st: os.stat() result for file_path
+        
+    Returns:
+        str: Path the decoded WAV is (or will be) cached at
+    """
+    # Key on mtime and size too, so an edited file gets a fresh decode
+    key_data = os.fsencode(file_path) + f":{st.st_mtime_ns}:{st.st_size}".encode()
+    return os.path.join(WAV_CACHE_DIR, hashlib.blake2b(key_data, digest_size=16).hexdigest() + '.wav')
+
+def get_cached_wav(file_path, st):
+    """
+    Look up a finished decode of a WavPack file
+    
+    Args:
+        file_path: Absolute path to the .wv file
+        st: os.stat() result for file_path
+        
+    Returns:
+        str: Path to the cached WAV file, or None if it hasn't been decoded yet
+    """
+    cache_path = wav_cache_path(file_path, st)
+    try:
+        # Bump only the access time on a hit so eviction drops the least recently
+        # played files first; mtime stays put because it feeds the response ETag
+        cached_st = os.stat(cache_path)
+        os.utime(cache_path, ns=(time.time_ns(), cached_st.st_mtime_ns))
+        return cache_path
+    except FileNotFoundError:
+        return None
+
+def stream_wav_decode(file_path, st, chunk_size):
+    """
+    Stream a WavPack file as WAV while it is decoded into the cache
+    
+    The first request for a file starts wvunpack writing to a temp file in the
+    background; it and any request arriving before the decode finishes read
+    that file as it grows, so playback starts at once and the file is only
+    decoded once.
+    
+    Args:
+        file_path: Absolute path to the .wv file
+        st: os.stat() result for file_path
+        chunk_size: Size of the chunks to yield
+        
+    Returns:
+        Generator of WAV bytes
+        
+    Raises:
+        OSError: If the cache can't be written or wvunpack can't be started
+        subprocess.SubprocessError: If wvunpack fails before writing anything
+    """
+    decode = _start_decode(file_path, st)
+    # A finished decode renames the temp file into the cache; a handle opened
+    # before that keeps following the same file
+    try:
+        f = open(decode.tmp_path, 'rb')
+    except FileNotFoundError:
+        # Finished in the meantime
+        f = open(decode.cache_path, 'rb')
+    
+    # Hold the response until there is output, so a decode that fails outright
+    # can still be reported (and the caller fall back) before headers are sent
+    while os.fstat(f.fileno()).st_size == 0 and not decode.done.wait(FOLLOW_POLL_INTERVAL):
+        pass
+    if decode.error is not None and os.fstat(f.fileno()).st_size == 0:
+        f.close()
+        raise decode.error
+    return _follow_decode(decode, f, chunk_size)
+
+def _start_decode(file_path, st):
+    """Join the running decode of a file, or start one"""
+    cache_path = wav_cache_path(file_path, st)
+    with _decodes_lock:
+        decode = _decodes.get(cache_path)
+        if decode is not None:
+            return decode
+        
+        os.makedirs(WAV_CACHE_DIR, exist_ok=True)
+        # Decode to a temp file and rename it, so lookups never see a partial WAV
+        fd, tmp_path = tempfile.mkstemp(dir=WAV_CACHE_DIR, suffix='.tmp')
+        os.close(fd)
+        try:
+            process = subprocess.Popen(
+                ['wvunpack', '-q', '-y', file_path, '-o', tmp_path],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        
+        decode = WavDecode(tmp_path, cache_path)
+        _decodes[cache_path] = decode
+    
+    threading.Thread(
+        target=_finish_decode, args=(decode, process, file_path),
+        name='wav-decode', daemon=True
+    ).start()
+    return decode
+
+def _finish_decode(decode, process, file_path):
+    """Wait for wvunpack, then publish its output to the cache or discard it"""
+    try:
+        try:
+            process.wait(timeout=WAV_DECODE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+            raise
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, process.args)
+        os.replace(decode.tmp_path, decode.cache_path)
+    except BaseException as e:
+        decode.error = e
+        logger.error(f"WAV transcode of {file_path} failed: {e}")
+        try:
+            os.remove(decode.tmp_path)
+        except OSError:
+            pass
+    else:
+        logger.info(f"Cached WAV transcode of {file_path}")
+        prune_wav_cache(keep=decode.cache_path)
+    finally:
+        with _decodes_lock:
+            _decodes.pop(decode.cache_path, None)
+        decode.done.set()
+
+def _follow_decode(decode, f, chunk_size):
+    """Yield a decode's output as it is written, until wvunpack exits"""
+    with f:
+        while True:
+            chunk = f.read(chunk_size)
+            if chunk:
+                yield chunk
+            elif decode.done.is_set():
+                # Anything written just before exiting was read above, since
+                # done is only set after wvunpack has exited
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+            else:
+                decode.done.wait(FOLLOW_POLL_INTERVAL)
+    if decode.error is not None:
+        # Headers are long gone, so the client just sees a short stream
+        logger.warning(f"Stopped streaming {decode.cache_path} early: {decode.error}")
+
+def prune_wav_cache(keep=None):
+    """
+    Delete least recently used WAVs until the cache fits in WAV_CACHE_MAX_BYTES
+    
+    Args:
+        keep: Cache path that must not be evicted (the one about to be served)
+    """
+    try:
+        with os.scandir(WAV_CACHE_DIR) as it:
+            entries = []
+            for entry in it:
+                if entry.name.endswith('.wav'):
+                    st = entry.stat()
+                    entries.append((st.st_atime, st.st_size, entry.path))
+    except OSError as e:
+        logger.warning(f"Could not scan WAV cache: {e}")
+        return
+    
+    total_size = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total_size <= WAV_CACHE_MAX_BYTES:
+            break
+        if path == keep:
+            continue
+        try:
+            # Files still being streamed stay readable until their handle is closed
+            os.remove(path)
+            total_size -= size
+        except OSError:
+            pass
@@ -27,7 +27,11 @@ backlog = 2048
 # IMPORTANT: Using single worker due to in-memory state (history, inference cache)
 # Multiple workers would each have separate state, breaking undo/redo functionality
 workers = 1
-worker_class = 'sync'
+# Concurrency comes from threads inside that one worker instead, so a long batch
+# operation or a WAV transcode doesn't stall browsing, history and playback;
+# requests that change files or history still run one at a time (app.WRITE_LOCK)
+worker_class = 'gthread'
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
 worker_connections = 1000
 timeout = 120  # 2 minutes for long batch operations
 keepalive = 5
@@ -58,7 +62,11 @@ secure_scheme_headers = {'X-FORWARDED-PROTOCOL': 'https', 'X-FORWARDED-PROTO': '
 
 # Performance
 sendfile = True  # Use sendfile() for better file streaming performance
-preload_app = False  # Don't preload app to avoid issues with file handles/subprocesses
+# Keep importing the app in the worker: it installs its SIGTERM/SIGINT handlers
+# and creates the history temp dir at import time, and with preloading the
+# arbiter's handlers would replace the former while each restarted worker would
+# inherit a temp dir its predecessor already removed on exit
+preload_app = False
 
 # Server hooks for graceful shutdown
 def worker_int(worker):
@@ -1996,7 +1996,7 @@
                         message += ` (${result.filesSkipped} files didn't have this field)`;
                     }
                     if (result.errors && result.errors.length > 0) {
-                        message += ` - ${result.errors.length} errors`;
+                        message += ` - ${result.errors.length + (result.errorsTruncated || 0)} errors`;
                         console.error('Batch delete errors:', result.errors);
                     }
                     
@@ -0,0 +1,26 @@
+# Metadata Remote - Intelligent audio metadata editor
+# Copyright (C) 2025 Dr. William Nelson Leonard
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Shared test setup: point the app at an empty temporary music folder
+"""
+import os
+import sys
+import tempfile
+
+# config reads MUSIC_DIR at import time, so set it before any test imports app
+os.environ['MUSIC_DIR'] = tempfile.mkdtemp(prefix='metadata_remote_test_')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,48 @@
+# Metadata Remote - Intelligent audio metadata editor
+# Copyright (C) 2025 Dr. William Nelson Leonard
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Folder batch endpoints must pass process_folder_files' error responses through
+"""
+import pytest
+
+from app import app
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+def test_apply_field_to_outside_folder_is_forbidden(client):
+    response = client.post('/apply-field-to-folder', json={'folderPath': '../outside', 'field': 'album', 'value': 'x'})
+    assert response.status_code == 403
+    assert response.get_json() == {'error': 'Invalid path'}
+
+def test_apply_field_to_missing_folder_is_not_found(client):
+    response = client.post('/apply-field-to-folder', json={'folderPath': 'missing', 'field': 'album', 'value': 'x'})
+    assert response.status_code == 404
+    assert response.get_json() == {'error': 'Folder not found'}
+
+def test_apply_art_to_outside_folder_is_forbidden(client):
+    response = client.post('/apply-art-to-folder', json={'folderPath': '../outside', 'art': 'data:image/png;base64,AA=='})
+    assert response.status_code == 403
+
+def test_apply_art_to_missing_folder_is_not_found(client):
+    response = client.post('/apply-art-to-folder', json={'folderPath': 'missing', 'art': 'data:image/png;base64,AA=='})
+    assert response.status_code == 404
+
+def test_delete_field_from_missing_folder_is_not_found(client):
+    response = client.post('/delete-field-from-folder', json={'folderPath': 'missing', 'fieldId': 'MOOD'})
+    assert response.status_code == 404
@@ -0,0 +1,73 @@
+# Metadata Remote - Intelligent audio metadata editor
+# Copyright (C) 2025 Dr. William Nelson Leonard
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Undo must restore the raw tag, not just the value the editor displays
+"""
+import os
+
+import pytest
+from mutagen.id3 import ID3, TIT2
+
+from app import app, history
+from config import MUSIC_DIR
+
+# Silent MPEG-1 Layer III frames, enough for mutagen to open the file
+MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0x00]) + b'\0' * 413
+
+@pytest.fixture
+def mp3_path():
+    path = os.path.join(MUSIC_DIR, 'replay.mp3')
+    with open(path, 'wb') as f:
+        f.write(MP3_FRAME * 20)
+    yield path
+    os.remove(path)
+    history.clear()
+
+def set_raw_title(path, *texts):
+    tags = ID3(path)
+    tags['TIT2'] = TIT2(encoding=3, text=list(texts))
+    tags.save(path)
+
+def raw_title(path):
+    return [str(text) for text in ID3(path)['TIT2'].text]
+
+def undo_latest(client):
+    latest = client.get('/history').get_json()['actions'][0]
+    return client.post(f"/history/{latest['id']}/undo")
+
+def test_undo_rewrites_multi_valued_tag_that_displays_as_target(mp3_path):
+    client = app.test_client()
+    assert client.post('/metadata/replay.mp3', json={'title': 'Old'}).status_code == 200
+    assert client.post('/metadata/replay.mp3', json={'title': 'New'}).status_code == 200
+
+    # Displays as 'Old', but the raw frame still carries a second value
+    set_raw_title(mp3_path, 'Old', 'Extra')
+    assert client.get('/metadata/replay.mp3').get_json()['title'] == 'Old'
+
+    assert undo_latest(client).status_code == 200
+    assert raw_title(mp3_path) == ['Old']
+
+def test_undo_skips_write_when_raw_tag_already_matches(mp3_path):
+    client = app.test_client()
+    client.post('/metadata/replay.mp3', json={'title': 'Old'})
+    client.post('/metadata/replay.mp3', json={'title': 'New'})
+    set_raw_title(mp3_path, 'Old')
+    os.utime(mp3_path, (1, 1))
+
+    assert undo_latest(client).status_code == 200
+    assert raw_title(mp3_path) == ['Old']
+    assert os.stat(mp3_path).st_mtime == 1
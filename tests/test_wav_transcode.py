@@ -0,0 +1,89 @@
+# Metadata Remote - Intelligent audio metadata editor
+# Copyright (C) 2025 Dr. William Nelson Leonard
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+WavPack decodes are streamed while they run, shared between requests and time-limited
+"""
+import os
+import stat
+import subprocess
+import threading
+import time
+
+import pytest
+
+from core import transcode
+
+# Stand-in for wvunpack: appends one line per 0.2s to the output, logging each run
+FAKE_WVUNPACK = '''#!/bin/sh
+out=""; while [ $# -gt 0 ]; do [ "$1" = "-o" ] && { shift; out="$1"; }; shift; done
+echo run >> "$RUN_LOG"
+for i in 1 2 3 4 5; do echo "chunk $i" >> "$out"; sleep 0.2; done
+'''
+
+@pytest.fixture
+def wavpack(tmp_path, monkeypatch):
+    bin_dir = tmp_path / 'bin'
+    bin_dir.mkdir()
+    script = bin_dir / 'wvunpack'
+    script.write_text(FAKE_WVUNPACK)
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv('PATH', f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setenv('RUN_LOG', str(tmp_path / 'runs'))
+    monkeypatch.setattr(transcode, 'WAV_CACHE_DIR', str(tmp_path / 'cache'))
+
+    source = tmp_path / 'song.wv'
+    source.write_bytes(b'wvpk')
+    return str(source), tmp_path / 'runs'
+
+def test_first_bytes_arrive_before_the_decode_finishes(wavpack):
+    source, _ = wavpack
+    started = time.monotonic()
+    stream = transcode.stream_wav_decode(source, os.stat(source), 1024)
+    assert next(stream).startswith(b'chunk 1')
+    assert time.monotonic() - started < 0.6
+    assert b''.join(stream).count(b'chunk') == 4
+    assert transcode.get_cached_wav(source, os.stat(source)) is not None
+
+def test_concurrent_requests_share_one_decode(wavpack):
+    source, runs = wavpack
+    outputs = []
+
+    def play():
+        outputs.append(b''.join(transcode.stream_wav_decode(source, os.stat(source), 1024)))
+
+    threads = [threading.Thread(target=play) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert runs.read_text().count('run') == 1
+    assert len(outputs) == 3
+    assert all(output.count(b'chunk') == 5 for output in outputs)
+
+def test_stuck_decode_is_killed(wavpack, monkeypatch):
+    source, _ = wavpack
+    monkeypatch.setattr(transcode, 'WAV_DECODE_TIMEOUT', 0.3)
+    output = b''.join(transcode.stream_wav_decode(source, os.stat(source), 1024))
+    assert output.count(b'chunk') < 5
+    assert transcode.get_cached_wav(source, os.stat(source)) is None
+
+def test_failed_decode_is_raised_before_streaming(wavpack, tmp_path):
+    source, _ = wavpack
+    (tmp_path / 'bin' / 'wvunpack').write_text('#!/bin/sh\nexit 1\n')
+    with pytest.raises(subprocess.CalledProcessError):
+        transcode.stream_wav_decode(source, os.stat(source), 1024)
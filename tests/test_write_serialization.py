@@ -0,0 +1,44 @@
+# Metadata Remote - Intelligent audio metadata editor
+# Copyright (C) 2025 Dr. William Nelson Leonard
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU Affero General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU Affero General Public License for more details.
+#
+# You should have received a copy of the GNU Affero General Public License
+# along with this program.  If not, see <https://www.gnu.org/licenses/>.
+
+"""
+Requests that change files or history must wait for WRITE_LOCK
+"""
+import threading
+
+import app as app_module
+from app import app
+
+def test_every_write_route_holds_the_write_lock():
+    for rule in app.url_map.iter_rules():
+        if rule.methods & {'POST', 'PUT', 'PATCH', 'DELETE'}:
+            view = app.view_functions[rule.endpoint]
+            assert getattr(view, '__wrapped__', None) is not None, rule.rule
+
+def test_write_waits_for_a_write_in_progress():
+    client = app.test_client()
+    finished = threading.Event()
+
+    def post():
+        client.post('/create-folder', json={'parentPath': '', 'folderName': 'serialized'})
+        finished.set()
+
+    with app_module.WRITE_LOCK:
+        thread = threading.Thread(target=post)
+        thread.start()
+        assert not finished.wait(0.3)
+    thread.join(5)
+    assert finished.is_set()